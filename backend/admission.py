@@ -0,0 +1,110 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Dict, Tuple
+from fastapi.responses import ORJSONResponse
+from config import settings
+from metrics import registry, Counter, Gauge, Histogram, LATENCY_BUCKETS
+
+class AdmissionController:
+    def __init__(self, name: str, limit: int, queue_size: int, max_wait_seconds: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait_seconds = max_wait_seconds
+        self.running = 0
+        self.service_seconds = 0.1
+        self._waiters: deque = deque()
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil((len(self._waiters) + 1) * self.service_seconds / self.limit))
+
+    async def acquire(self) -> bool:
+        if self.running < self.limit and not self._waiters:
+            self.running += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait_seconds or None)
+            return True
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on.
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return False
+
+    def release(self, service_seconds: float = None):
+        if service_seconds is not None:
+            self.service_seconds += 0.1 * (service_seconds - self.service_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+admission_controllers: Dict[Tuple[str, str], AdmissionController] = {}
+if settings.admission_start_limit > 0:
+    admission_controllers[("GET", "/exams/start")] = AdmissionController(
+        "/exams/start", settings.admission_start_limit,
+        settings.admission_queue_size, settings.admission_max_wait_seconds
+    )
+if settings.admission_submit_limit > 0:
+    admission_controllers[("POST", "/exams/submit")] = AdmissionController(
+        "/exams/submit", settings.admission_submit_limit,
+        settings.admission_queue_size, settings.admission_max_wait_seconds
+    )
+
+admission_rejected = registry.register(Counter(
+    "exam_app_admission_rejected_total", "Requests turned away with 429 by admission control", ("route",)))
+admission_wait = registry.register(Histogram(
+    "exam_app_admission_wait_seconds", "Time admitted requests spent queued", LATENCY_BUCKETS, ("route",)))
+registry.register(Gauge(
+    "exam_app_admission_queue_depth", "Requests waiting for an admission slot",
+    lambda: {(c.name,): c.queue_depth for c in admission_controllers.values()}, ("route",)))
+registry.register(Gauge(
+    "exam_app_admission_in_flight", "Requests holding an admission slot",
+    lambda: {(c.name,): c.running for c in admission_controllers.values()}, ("route",)))
+
+class AdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        controller = None
+        if scope["type"] == "http":
+            controller = admission_controllers.get((scope["method"], scope["path"]))
+        if controller is None:
+            await self.app(scope, receive, send)
+            return
+
+        queued = time.perf_counter()
+        if not await controller.acquire():
+            admission_rejected.inc((controller.name,))
+            response = ORJSONResponse(
+                {"detail": "Too many candidates are starting or submitting exams, please retry shortly"},
+                status_code=429,
+                headers={"Retry-After": str(controller.retry_after())}
+            )
+            await response(scope, receive, send)
+            return
+
+        admitted = time.perf_counter()
+        admission_wait.observe(admitted - queued, (controller.name,))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(time.perf_counter() - admitted)
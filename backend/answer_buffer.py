@@ -0,0 +1,179 @@
+import threading
+import time
+from typing import Dict, Optional
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal, dialect_insert
+from metrics import registry, Counter, Gauge, Histogram, LATENCY_BUCKETS
+from models import Exam, ExamAnswer
+
+autosaved_answers = registry.register(Counter(
+    "exam_app_autosave_answers_total", "Answers accepted by the autosave endpoint"))
+autosave_flushed_rows = registry.register(Counter(
+    "exam_app_autosave_flushed_rows_total", "Coalesced answers written to exam_answers by autosave flushes"))
+autosave_flush_duration = registry.register(Histogram(
+    "exam_app_autosave_flush_seconds", "Time spent writing one autosave flush", LATENCY_BUCKETS))
+autosave_flush_lag = registry.register(Histogram(
+    "exam_app_autosave_flush_lag_seconds", "Age of the oldest buffered answer when its flush committed", LATENCY_BUCKETS))
+autosave_flush_errors = registry.register(Counter(
+    "exam_app_autosave_flush_errors_total", "Autosave flushes that failed and were put back in the buffer"))
+
+def save_answers(db: Session, pending: Dict[int, Dict[int, str]]) -> int:
+    # Lock the exams so a concurrent submit either sees these rows or makes us skip the exam.
+    live = db.execute(
+        select(Exam.id).where(Exam.id.in_(pending), Exam.is_completed == False).order_by(Exam.id).with_for_update()
+    ).scalars().all()
+    rows = [
+        {"exam_id": exam_id, "question_id": question_id, "selected_answer": selected_answer}
+        for exam_id in live
+        for question_id, selected_answer in pending[exam_id].items()
+    ]
+    if not rows:
+        return 0
+
+    statement = dialect_insert(db.get_bind().dialect.name, ExamAnswer)
+    if statement is None:
+        for exam_id in live:
+            db.execute(delete(ExamAnswer).where(
+                ExamAnswer.exam_id == exam_id,
+                ExamAnswer.question_id.in_(pending[exam_id]),
+                ExamAnswer.is_correct.is_(None)
+            ))
+        db.execute(insert(ExamAnswer), rows)
+    else:
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[ExamAnswer.exam_id, ExamAnswer.question_id],
+            set_={"selected_answer": statement.excluded.selected_answer},
+            where=ExamAnswer.is_correct.is_(None)
+        ), rows)
+
+    # SQLite does not lock rows; drop anything written for an exam that was submitted meanwhile.
+    db.execute(delete(ExamAnswer).where(
+        ExamAnswer.exam_id.in_(live),
+        ExamAnswer.is_correct.is_(None),
+        ExamAnswer.exam_id.in_(select(Exam.id).where(Exam.id.in_(live), Exam.is_completed == True))
+    ).execution_options(synchronize_session=False))
+    return len(rows)
+
+class AnswerBuffer:
+    def __init__(self, flush_interval_seconds: float, max_buffered: int):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffered = max_buffered
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Dict[int, str]] = {}
+        self._flushing: Dict[int, Dict[int, str]] = {}
+        self._size = 0
+        self._oldest: Optional[float] = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self.flush_interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="answer-autosave", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        thread.join(timeout=10)
+
+    def put(self, exam_id: int, answers: Dict[int, str]):
+        with self._lock:
+            pending = self._pending.setdefault(exam_id, {})
+            before = len(pending)
+            pending.update(answers)
+            self._size += len(pending) - before
+            if self._oldest is None:
+                self._oldest = time.perf_counter()
+            full = self._size >= self.max_buffered
+        autosaved_answers.inc(amount=len(answers))
+        if full:
+            self._wake.set()
+
+    def save(self, db: Session, exam_id: int, answers: Dict[int, str]):
+        if self.running:
+            self.put(exam_id, answers)
+            return
+        save_answers(db, {exam_id: answers})
+        db.commit()
+        autosaved_answers.inc(amount=len(answers))
+
+    def peek(self, exam_id: int) -> Dict[int, str]:
+        with self._lock:
+            # Answers already handed to a flush are included too, in case the flush loses the race with submit.
+            return {**self._flushing.get(exam_id, {}), **self._pending.get(exam_id, {})}
+
+    def discard(self, exam_id: int):
+        with self._lock:
+            self._size -= len(self._pending.pop(exam_id, {}))
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            oldest, self._oldest = self._oldest, None
+            self._size = 0
+            self._flushing = pending
+        if not pending:
+            return 0
+
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            written = save_answers(db, pending)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._restore(pending, oldest)
+            raise
+        finally:
+            db.close()
+            with self._lock:
+                self._flushing = {}
+
+        finished = time.perf_counter()
+        autosave_flushed_rows.inc(amount=written)
+        autosave_flush_duration.observe(finished - started)
+        autosave_flush_lag.observe(finished - oldest)
+        return written
+
+    def _restore(self, pending: Dict[int, Dict[int, str]], oldest: float):
+        with self._lock:
+            for exam_id, answers in pending.items():
+                current = self._pending.setdefault(exam_id, {})
+                for question_id, selected_answer in answers.items():
+                    if question_id not in current:
+                        current[question_id] = selected_answer
+                        self._size += 1
+            self._oldest = min(oldest, self._oldest or oldest)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                autosave_flush_errors.inc()
+        try:
+            self.flush()
+        except Exception:
+            autosave_flush_errors.inc()
+
+answer_buffer = AnswerBuffer(settings.autosave_flush_interval_ms / 1000, settings.autosave_max_buffered)
+
+registry.register(Gauge(
+    "exam_app_autosave_buffered_answers", "Autosaved answers waiting to be flushed", lambda: len(answer_buffer)))
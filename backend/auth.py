@@ -1,25 +1,27 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, get_async_db
 from models import User
-from schemas import TokenData
+from schemas import TokenData, User as UserSchema
 from config import settings
+from user_cache import token_cache
+from hashing import get_pwd_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -29,26 +31,55 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
-def verify_token(token: str, credentials_exception):
+def decode_token(token: str, credentials_exception):
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    return token_data
+    if payload.get("sub") is None:
+        raise credentials_exception
+    return payload
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def verify_token(token: str, credentials_exception):
+    payload = decode_token(token, credentials_exception)
+    return TokenData(username=payload["sub"])
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    credentials_exception = _credentials_exception()
+    token = credentials.credentials
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached[1]
+    
+    claims = decode_token(token, credentials_exception)
+    user = db.query(User).filter(User.username == claims["sub"]).first()
+    snapshot = UserSchema.model_validate(user) if user is not None else None
+    db.rollback()
+    if snapshot is None:
+        raise credentials_exception
+    token_cache.put(token, claims, snapshot)
+    return snapshot
+
+async def get_current_user_async(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
+    credentials_exception = _credentials_exception()
     token = credentials.credentials
-    token_data = verify_token(token, credentials_exception)
-    user = db.query(User).filter(User.username == token_data.username).first()
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached[1]
+    
+    claims = decode_token(token, credentials_exception)
+    result = await db.execute(select(User).where(User.username == claims["sub"]))
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
-    return user
+    snapshot = UserSchema.model_validate(user)
+    token_cache.put(token, claims, snapshot)
+    return snapshot
@@ -0,0 +1,23 @@
+import time
+from database import SessionLocal
+from create_schema import create_schema
+from user_stats import backfill_user_stats
+
+def backfill():
+    create_schema()
+    db = SessionLocal()
+    
+    try:
+        started = time.perf_counter()
+        count = backfill_user_stats(db)
+        db.commit()
+        print(f"Rebuilt statistics for {count} user(s) in {time.perf_counter() - started:.1f}s")
+        
+    except Exception as e:
+        print(f"Error backfilling user statistics: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from benchmarks.common import run_worker, scratch_database_url, summarize
+
+async def run_level(client, headers, concurrency, total_requests):
+    latencies = []
+    errors = 0
+    remaining = total_requests
+    peak_threads = threading.active_count()
+
+    async def worker():
+        nonlocal remaining, errors, peak_threads
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.get("/exams/history", headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+            peak_threads = max(peak_threads, threading.active_count())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        **summarize(latencies, errors, elapsed),
+        "peak_threads": peak_threads,
+    }
+
+def prepare_data(history_size):
+    from datetime import datetime
+    from sqlalchemy import insert
+    from auth import create_access_token
+    from database import SessionLocal
+    from models import Exam, User
+
+    db = SessionLocal()
+    try:
+        user = User(email="bench@example.com", username="bench", hashed_password="!")
+        db.add(user)
+        db.commit()
+        now = datetime.utcnow()
+        db.execute(insert(Exam), [
+            {
+                "user_id": user.id, "end_time": now, "is_completed": True,
+                "score": 50.0, "total_questions": 10, "correct_answers": 5,
+            }
+            for _ in range(history_size)
+        ])
+        db.commit()
+        return create_access_token({"sub": user.username})
+    finally:
+        db.close()
+
+async def worker_main(args):
+    import httpx
+    import main
+    from create_schema import create_schema
+    from database import async_engine
+
+    create_schema()
+    token = prepare_data(args.history_size)
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await client.get("/exams/history", headers=headers)
+        for concurrency in args.concurrency:
+            print(json.dumps(await run_level(client, headers, concurrency, args.requests)), flush=True)
+    if async_engine is not None:
+        await async_engine.dispose()
+
+def run_mode(mode, args):
+    env = {
+        "ASYNC_DATABASE": "true" if mode == "async" else "false",
+        "DATABASE_URL": scratch_database_url(args.database_url),
+    }
+    worker_args = [
+        "--requests", str(args.requests), "--history-size", str(args.history_size),
+        "--concurrency", *map(str, args.concurrency),
+    ]
+    return run_worker("benchmarks.bench_async_db", worker_args, env)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare concurrent request handling of the sync and async database modes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200, 500])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument("--history-size", type=int, default=20, help="Completed exams per user returned by /exams/history")
+    parser.add_argument("--database-url", help="Empty scratch database to use instead of a temporary SQLite file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(worker_main(args))
+        return
+
+    # "threads" is the process thread count: anyio worker threads in sync mode,
+    # plus one thread per open connection when the async driver is aiosqlite.
+    print(f"{'mode':<6} {'in-flight':>9} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} {'threads':>8}")
+    for mode in ("sync", "async"):
+        for row in run_mode(mode, args):
+            print(
+                f"{mode:<6} {row['concurrency']:>9} {row['throughput_rps']:>9} {row['p50_ms']:>9}"
+                f" {row['p99_ms']:>9} {row['errors']:>7} {row['peak_threads']:>8}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import time
+from datetime import datetime
+from typing import List
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from models import Question
+from schemas import Question as QuestionSchema
+from question_cache import json_array
+
+def make_questions(count):
+    return [
+        Question(
+            id=i,
+            question_text=f"Benchmark question {i} with a realistically long prompt about something?",
+            option_a="First option", option_b="Second option", option_c="Third option", option_d="Fourth option",
+            correct_answer="ABCD"[i % 4],
+            created_at=datetime(2024, 1, 1, 12, 0, i % 60),
+        )
+        for i in range(count)
+    ]
+
+def response_model_path(questions, response_class):
+    # What FastAPI does for response_model=List[QuestionSchema]: validate from attributes,
+    # dump to JSON-compatible data, then render with the response class.
+    adapter = TypeAdapter(List[QuestionSchema])
+
+    def run():
+        value = adapter.validate_python(questions, from_attributes=True)
+        return response_class(adapter.dump_python(value, mode="json")).body
+    return run
+
+def fragment_path(questions):
+    fragments = {q.id: QuestionSchema.model_validate(q).model_dump_json().encode() for q in questions}
+    ids = [q.id for q in questions]
+
+    def run():
+        return json_array(fragments[i] for i in ids)
+    return run
+
+def timed(fn, repeat):
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare /exams/start serialization cost per request")
+    parser.add_argument("--questions", type=int, default=10, help="Questions per exam")
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    questions = make_questions(args.questions)
+    paths = [
+        ("response_model + JSONResponse", response_model_path(questions, JSONResponse)),
+        ("response_model + ORJSONResponse", response_model_path(questions, ORJSONResponse)),
+        ("cached fragments", fragment_path(questions)),
+    ]
+    print(f"{'path':<33} {'us/request':>11}")
+    baseline = None
+    for name, run in paths:
+        cost = timed(run, args.repeat)
+        baseline = baseline or cost
+        print(f"{name:<33} {cost:>11.1f}  ({baseline / cost:.1f}x)")
+
+if __name__ == "__main__":
+    main()
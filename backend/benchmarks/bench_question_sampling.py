@@ -0,0 +1,77 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+from models import Base, Question
+from question_sampler import QuestionSampler
+
+def populate(engine, size, batch_size=50000):
+    with engine.begin() as conn:
+        for start in range(0, size, batch_size):
+            rows = [
+                {
+                    "question_text": f"Synthetic question {i}",
+                    "option_a": "A", "option_b": "B", "option_c": "C", "option_d": "D",
+                    "correct_answer": "ABCD"[i % 4],
+                }
+                for i in range(start, min(start + batch_size, size))
+            ]
+            conn.execute(insert(Question), rows)
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def bench(size, k, repeat, database_url=None):
+    workdir = None
+    if database_url is None:
+        workdir = tempfile.mkdtemp()
+        database_url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine, tables=[Question.__table__])
+    Base.metadata.create_all(bind=engine, tables=[Question.__table__])
+    populate(engine, size)
+
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        order_by_random = timed(
+            lambda: db.query(Question).order_by(func.random()).limit(k).all(), repeat
+        )
+        sampler = QuestionSampler()
+        started = time.perf_counter()
+        sampler.load(db)
+        load_ms = (time.perf_counter() - started) * 1000
+        sampled = timed(lambda: sampler.sample(db, k), repeat)
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine, tables=[Question.__table__])
+        engine.dispose()
+    if workdir:
+        os.remove(os.path.join(workdir, "bench.db"))
+        os.rmdir(workdir)
+
+    print(
+        f"{size:>9} questions | ORDER BY random(): {order_by_random:9.2f} ms"
+        f" | sampler: {sampled:7.2f} ms (one-off load {load_ms:.0f} ms)"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ORDER BY random() with QuestionSampler")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", help="Scratch database to use instead of a temporary SQLite file; its questions table is dropped")
+    args = parser.parse_args()
+    for size in args.sizes:
+        bench(size, args.k, args.repeat, args.database_url)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.error import URLError
+from benchmarks.common import run_worker, scratch_database_url
+
+MODES = {
+    "schema-on-startup": {"CREATE_SCHEMA_ON_STARTUP": "true"},
+    "schema-precreated": {"CREATE_SCHEMA_ON_STARTUP": "false"},
+}
+
+async def worker_main():
+    import httpx
+
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/health")
+            response.raise_for_status()
+        answered = time.perf_counter()
+
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "lifespan_ms": (ready - imported) * 1000,
+        "first_request_ms": (answered - started) * 1000,
+    }), flush=True)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def time_server(env):
+    # Wall time from spawning uvicorn to the first successful response, interpreter start included.
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env},
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                    return (time.perf_counter() - started) * 1000
+            except (URLError, ConnectionError):
+                if process.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with {process.returncode} before answering")
+                time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and time to first request for each startup mode")
+    parser.add_argument("--repeat", type=int, default=5, help="Cold starts per mode")
+    parser.add_argument("--database-url", help="Database to start against instead of a temporary SQLite file")
+    parser.add_argument("--no-server", action="store_true", help="Skip the uvicorn wall-clock measurement")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(worker_main())
+        return
+
+    database_url = scratch_database_url(args.database_url)
+    subprocess.run(
+        [sys.executable, "create_schema.py"], env={**os.environ, "DATABASE_URL": database_url},
+        check=True, stdout=subprocess.DEVNULL,
+    )
+
+    print(f"{'mode':<18} {'import ms':>10} {'lifespan ms':>12} {'first req ms':>13} {'uvicorn ms':>11}")
+    for mode, mode_env in MODES.items():
+        env = {"DATABASE_URL": database_url, **mode_env}
+        runs = [run_worker("benchmarks.bench_startup", [], env)[0] for _ in range(args.repeat)]
+        server = [time_server(env) for _ in range(args.repeat)] if not args.no_server else []
+        median = lambda key: statistics.median(run[key] for run in runs)
+        print(
+            f"{mode:<18} {median('import_ms'):>10.1f} {median('lifespan_ms'):>12.1f} {median('first_request_ms'):>13.1f}"
+            f" {statistics.median(server) if server else float('nan'):>11.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from benchmarks.common import run_worker, scratch_database_url, summarize
+
+QUESTIONS = 50
+
+def prepare_data(candidates):
+    from sqlalchemy import insert
+    from auth import create_access_token
+    from database import SessionLocal
+    from models import Question, User
+
+    prefix = f"candidate{os.getpid()}-"
+    db = SessionLocal()
+    try:
+        db.execute(insert(Question), [
+            {
+                "question_text": f"Benchmark question {i}",
+                "option_a": "A", "option_b": "B", "option_c": "C", "option_d": "D",
+                "correct_answer": "ABCD"[i % 4],
+            }
+            for i in range(QUESTIONS)
+        ])
+        db.execute(insert(User), [
+            {"email": f"{prefix}{i}@example.com", "username": f"{prefix}{i}", "hashed_password": "!"}
+            for i in range(candidates)
+        ])
+        db.commit()
+        users = db.query(User.id, User.username).filter(User.username.startswith(prefix)).all()
+        question_ids = [row.id for row in db.query(Question.id).order_by(Question.id.desc()).limit(QUESTIONS)]
+        return [(user.id, create_access_token({"sub": user.username})) for user in users], question_ids
+    finally:
+        db.close()
+
+def open_exams(user_ids):
+    from sqlalchemy import insert
+    from database import SessionLocal
+    from models import Exam
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(Exam), [{"user_id": user_id, "total_questions": 10} for user_id in user_ids])
+        db.commit()
+    finally:
+        db.close()
+
+async def submit_burst(client, candidates, question_ids, concurrency, answers):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    payload = {"answers": [{"question_id": question_id, "selected_answer": "A"} for question_id in question_ids[:answers]]}
+
+    async def submit(token):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/exams/submit", json=payload, headers={"Authorization": f"Bearer {token}"})
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(submit(token) for _, token in candidates))
+    return latencies, errors, time.perf_counter() - started
+
+async def worker_main(args):
+    import httpx
+    import main
+    from create_schema import create_schema
+    from database import async_engine
+
+    create_schema()
+    candidates, question_ids = prepare_data(args.candidates)
+    latencies, errors, elapsed = [], 0, 0.0
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for _ in range(args.rounds):
+            open_exams([user_id for user_id, _ in candidates])
+            round_latencies, round_errors, round_elapsed = await submit_burst(
+                client, candidates, question_ids, args.concurrency, args.answers
+            )
+            latencies += round_latencies
+            errors += round_errors
+            elapsed += round_elapsed
+    if async_engine is not None:
+        await async_engine.dispose()
+    print(json.dumps(summarize(latencies, errors, elapsed)), flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure concurrent /exams/submit throughput under each database profile")
+    parser.add_argument("--profiles", nargs="+", default=["default", "production"], help="SQLITE_PROFILE values to compare")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[5])
+    parser.add_argument("--candidates", type=int, default=200, help="Candidates submitting in each round")
+    parser.add_argument("--concurrency", type=int, default=100, help="Submissions in flight at once")
+    parser.add_argument("--answers", type=int, default=10, help="Answers per submission")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--async-db", action="store_true", help="Run with ASYNC_DATABASE=true")
+    parser.add_argument("--database-url", help="Empty scratch database to use instead of a temporary SQLite file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(worker_main(args))
+        return
+
+    print(f"{'profile':<11} {'pool':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for profile in args.profiles:
+        for pool_size in args.pool_sizes:
+            env = {
+                "DATABASE_URL": scratch_database_url(args.database_url),
+                "SQLITE_PROFILE": profile,
+                "DB_POOL_SIZE": str(pool_size),
+                "ASYNC_DATABASE": "true" if args.async_db else "false",
+            }
+            worker_args = [
+                "--candidates", str(args.candidates), "--concurrency", str(args.concurrency),
+                "--answers", str(args.answers), "--rounds", str(args.rounds),
+            ]
+            for row in run_worker("benchmarks.bench_submit_profiles", worker_args, env):
+                print(
+                    f"{profile:<11} {pool_size:>5} {row['throughput_rps']:>9} {row['p50_ms']:>9}"
+                    f" {row['p95_ms']:>9} {row['p99_ms']:>9} {row['errors']:>7}"
+                )
+
+if __name__ == "__main__":
+    main()
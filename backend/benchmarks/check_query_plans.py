@@ -0,0 +1,125 @@
+import argparse
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+from config import settings
+from models import User, Exam
+from schemas import AnswerCreate, ExamSubmission, UserCreate
+from question_sampler import question_sampler
+from exam_reaper import reap_stale_exams
+from score_distribution import score_counts
+from routers import auth as auth_router, exams as exams_router
+
+SQLITE_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)")
+# A write narrowed only by the completion flag walks every exam in that state.
+SQLITE_FLAG_SEARCH = re.compile(r"^SEARCH \S+ USING (?:COVERING )?INDEX \S+ \(is_completed=\?\)$")
+
+def capture_router_queries(engine):
+    with engine.connect() as conn:
+        outer = conn.begin()
+        db = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            question_sampler.load(db)
+            user_id, username = db.execute(
+                select(User.id, User.username).where(~User.exams.any(Exam.is_completed == False)).limit(1)
+            ).one()
+            completed = db.execute(
+                select(Exam.id).where(Exam.is_completed == True).limit(1)
+            ).scalar_one()
+            owner = db.get(Exam, completed).user_id
+
+            captured = []
+            current = [None]
+
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                if not executemany:
+                    captured.append((current[0], statement, parameters))
+
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                scenarios = [
+                    ("auth.register", lambda: auth_router._ensure_available(
+                        db, UserCreate(email="plan@example.com", username="plan-check", password="x"))),
+                    ("auth.login", lambda: auth_router._get_user(db, username)),
+                    ("exams.start", lambda: exams_router._start_exam(db, user_id)),
+                    ("exams.submit", lambda: exams_router._submit_exam(db, user_id, ExamSubmission(answers=[
+                        AnswerCreate(question_id=q, selected_answer="A") for q in question_sampler.draw_ids(10)
+                    ]))),
+                    ("exams.results", lambda: exams_router._get_exam_results(db, owner, completed)),
+                    ("exams.stats", lambda: exams_router._get_exam_stats(db, owner)),
+                    ("exams.history", lambda: exams_router._get_exam_history(db, owner, settings.history_page_size)),
+                    ("exams.history.cursor", lambda: exams_router._get_exam_history(
+                        db, owner, settings.history_page_size, (datetime.utcnow(), completed))),
+                    ("exams.leaderboard", lambda: exams_router._get_leaderboard(db, settings.leaderboard_size)),
+                    ("score_distribution", lambda: score_counts(db)),
+                    ("reaper", lambda: reap_stale_exams(db, timedelta(0), settings.stale_exam_batch_size)),
+                ]
+                for name, scenario in scenarios:
+                    current[0] = name
+                    scenario()
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+            return captured
+        finally:
+            db.close()
+            outer.rollback()
+
+def explain(conn, statement, parameters):
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        plan = [row[-1] for row in rows]
+        write = statement.lstrip().upper().startswith(("UPDATE", "DELETE"))
+        return plan, [
+            line for line in plan if SQLITE_SCAN.match(line) or (write and SQLITE_FLAG_SEARCH.match(line))
+        ]
+    if dialect == "postgresql":
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        document = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        if isinstance(document, str):
+            document = json.loads(document)
+        plan, scans = [], []
+
+        def walk(node, depth=0):
+            line = "  " * depth + node["Node Type"] + (f" on {node['Relation Name']}" if "Relation Name" in node else "")
+            plan.append(line)
+            if node["Node Type"] == "Seq Scan":
+                scans.append(line.strip())
+            for child in node.get("Plans", []):
+                walk(child, depth + 1)
+
+        walk(document[0]["Plan"])
+        return plan, scans
+    raise SystemExit(f"Query plan checks are not implemented for {dialect}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if any router query falls back to a full table scan")
+    parser.add_argument("--database-url", default=settings.database_url,
+                        help="Database populated with benchmarks/scale_data.py")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every plan, not just failures")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    failures = 0
+    with engine.connect() as conn:
+        for scenario, statement, parameters in capture_router_queries(engine):
+            if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                continue
+            plan, scans = explain(conn, statement, parameters)
+            if scans or args.verbose:
+                status = "FULL SCAN" if scans else "ok"
+                print(f"[{status}] {scenario}: {' '.join(statement.split())}")
+                for line in plan:
+                    print(f"    {line}")
+            failures += bool(scans)
+
+    if failures:
+        print(f"{failures} router queries fall back to a full scan")
+        sys.exit(1)
+    print("All router queries use an index")
+
+if __name__ == "__main__":
+    main()
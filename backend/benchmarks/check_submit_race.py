@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from benchmarks.common import run_worker, scratch_database_url
+
+MODES = {
+    "sync": {"ASYNC_DATABASE": "false"},
+    "async": {"ASYNC_DATABASE": "true"},
+}
+# Where the flush commits relative to the submit: just before it peeks at buffered answers,
+# or between its reads and its first write to exam_answers.
+WINDOWS = ("read", "write")
+FLUSH_WAIT_SECONDS = 10
+
+async def worker_main(window: str):
+    import httpx
+    from sqlalchemy import event, select
+    import main
+    from seed_data import seed_questions
+    from answer_buffer import answer_buffer
+    from database import engine, async_engine, SessionLocal
+    from models import ExamAnswer
+
+    bind = async_engine.sync_engine if async_engine is not None else engine
+    flush = {"started": False, "result": None}
+    peek = answer_buffer.peek
+
+    def run_flush():
+        flush["started"] = True
+
+        def run():
+            try:
+                flush["result"] = answer_buffer.flush()
+            except Exception as exc:
+                flush["result"] = f"{type(exc).__name__}"
+
+        thread = threading.Thread(target=run, name="race-flush")
+        thread.start()
+        # Where the database serializes the two (row locks), the flush waits for the submit instead.
+        thread.join(FLUSH_WAIT_SECONDS)
+
+    def flush_before_peek(exam_id):
+        if not flush["started"]:
+            run_flush()
+        return peek(exam_id)
+
+    def flush_before_write(conn, cursor, statement, parameters, context, executemany):
+        if flush["started"] or threading.current_thread().name == "race-flush":
+            return
+        if statement.lstrip().upper().startswith(("DELETE FROM EXAM_ANSWERS", "INSERT INTO EXAM_ANSWERS")):
+            run_flush()
+
+    async with main.app.router.lifespan_context(main.app):
+        await asyncio.to_thread(seed_questions)
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+            credentials = {"username": "race", "password": "race-check"}
+            await client.post("/auth/register", json={**credentials, "email": "race@example.com"})
+            token = (await client.post("/auth/login", data=credentials)).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            questions = [q["id"] for q in (await client.get("/exams/start", headers=headers)).json()]
+            autosaved = {questions[0]: "A", questions[1]: "B"}
+            await client.put("/exams/answers", headers=headers, json={"answers": [
+                {"question_id": q, "selected_answer": a} for q, a in autosaved.items()
+            ]})
+
+            if window == "read":
+                answer_buffer.peek = flush_before_peek
+            else:
+                event.listen(bind, "before_cursor_execute", flush_before_write)
+            try:
+                response = await client.post("/exams/submit", headers=headers, json={"answers": [
+                    {"question_id": questions[2], "selected_answer": "C"}
+                ]})
+            finally:
+                if window == "read":
+                    answer_buffer.peek = peek
+                else:
+                    event.remove(bind, "before_cursor_execute", flush_before_write)
+
+    expected = {**autosaved, questions[2]: "C"}
+    graded = {}
+    if response.status_code == 200:
+        db = SessionLocal()
+        try:
+            graded = {
+                question_id: (selected_answer, is_correct is not None)
+                for question_id, selected_answer, is_correct in db.execute(
+                    select(ExamAnswer.question_id, ExamAnswer.selected_answer, ExamAnswer.is_correct)
+                    .where(ExamAnswer.exam_id == response.json()["exam_id"])
+                )
+            }
+        finally:
+            db.close()
+
+    print(json.dumps({
+        "status": response.status_code,
+        "flush_ran": flush["started"],
+        "flush_result": flush["result"],
+        "graded_as_expected": graded == {q: (a, True) for q, a in expected.items()},
+    }), flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fail if submitting while an autosave flush is in flight errors or loses answers")
+    parser.add_argument("--database-url", help="Empty scratch database to use instead of a temporary SQLite file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--window", choices=WINDOWS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(worker_main(args.window))
+        return
+
+    failures = 0
+    for mode, mode_env in MODES.items():
+        for window in WINDOWS:
+            env = {
+                "DATABASE_URL": scratch_database_url(args.database_url),
+                "BCRYPT_ROUNDS": "4",
+                "AUTOSAVE_FLUSH_INTERVAL_MS": "3600000",
+                **mode_env,
+            }
+            result = run_worker("benchmarks.check_submit_race", ["--window", window], env)[0]
+            ok = result["status"] == 200 and result["flush_ran"] and result["graded_as_expected"]
+            failures += not ok
+            print(f"[{'ok' if ok else 'FAIL'}] {mode}, flush before {window}: {result}")
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def summarize(latencies_ms, errors, elapsed_seconds):
+    count = len(latencies_ms)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_rps": round(count / elapsed_seconds, 1) if elapsed_seconds else 0.0,
+        "p50_ms": round(statistics.median(latencies_ms), 2) if count else 0.0,
+        "p95_ms": round(percentile(latencies_ms, 0.95), 2) if count else 0.0,
+        "p99_ms": round(percentile(latencies_ms, 0.99), 2) if count else 0.0,
+    }
+
+def scratch_database_url(database_url=None):
+    if database_url:
+        return database_url
+    return f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+def run_worker(module, worker_args, env):
+    command = [sys.executable, "-m", module, "--worker", *worker_args]
+    output = subprocess.run(command, env={**os.environ, **env}, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return [json.loads(line) for line in output.splitlines() if line.startswith("{")]
@@ -0,0 +1,234 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from benchmarks.common import run_worker, scratch_database_url, summarize
+
+ENDPOINTS = ("register", "login", "start", "autosave", "submit", "results")
+QUESTIONS = 50
+
+class Recorder:
+    def __init__(self, retries=0):
+        self.retries = retries
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rejected = defaultdict(int)
+        self.windows = {}
+
+    async def call(self, endpoint, send):
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                response = await send()
+            except Exception:
+                response = None
+            if response is None or response.status_code != 429 or attempt == self.retries:
+                break
+            await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+        finished = time.perf_counter()
+        first, last = self.windows.get(endpoint, (started, finished))
+        self.windows[endpoint] = (min(first, started), max(last, finished))
+        if response is not None and response.status_code == 429:
+            # Admission control turned the request away; keep it out of the latency percentiles.
+            self.rejected[endpoint] += 1
+            return None
+        self.latencies[endpoint].append((finished - started) * 1000)
+        if response is None or response.status_code >= 400:
+            self.errors[endpoint] += 1
+            return None
+        return response
+
+    def report(self, scenario, candidates, concurrency, elapsed):
+        endpoints = {}
+        for endpoint in ENDPOINTS:
+            first, last = self.windows.get(endpoint, (0.0, 0.0))
+            endpoints[endpoint] = {
+                **summarize(self.latencies[endpoint], self.errors[endpoint], last - first),
+                "rejected": self.rejected[endpoint],
+            }
+        everything = [latency for endpoint in ENDPOINTS for latency in self.latencies[endpoint]]
+        return {
+            "scenario": scenario,
+            "candidates": candidates,
+            "concurrency": concurrency,
+            "elapsed_seconds": round(elapsed, 2),
+            "endpoints": endpoints,
+            "total": {
+                **summarize(everything, sum(self.errors.values()), elapsed),
+                "rejected": sum(self.rejected.values()),
+            },
+        }
+
+async def sign_in(client, recorder, username, password):
+    response = await recorder.call("register", lambda: client.post(
+        "/auth/register", json={"email": f"{username}@example.com", "username": username, "password": password}
+    ))
+    if response is None:
+        return None
+    response = await recorder.call("login", lambda: client.post(
+        "/auth/login", data={"username": username, "password": password}
+    ))
+    if response is None:
+        return None
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def take_exam(client, recorder, headers, rng, autosave):
+    response = await recorder.call("start", lambda: client.get("/exams/start", headers=headers))
+    if response is None:
+        return
+    answers = [{"question_id": question["id"], "selected_answer": rng.choice("ABCD")} for question in response.json()]
+    for answer in answers[:autosave]:
+        # One autosave per click, the way a client saving progress would send them.
+        await recorder.call("autosave", lambda: client.put("/exams/answers", json={"answers": [answer]}, headers=headers))
+    response = await recorder.call("submit", lambda: client.post("/exams/submit", json={"answers": answers}, headers=headers))
+    if response is None:
+        return
+    exam_id = response.json()["exam_id"]
+    await recorder.call("results", lambda: client.get(f"/exams/results/{exam_id}", headers=headers))
+
+async def lifecycle(client, usernames, concurrency, password, seed, retries, autosave):
+    recorder = Recorder(retries)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def candidate(username, rng):
+        async with semaphore:
+            headers = await sign_in(client, recorder, username, password)
+            if headers:
+                await take_exam(client, recorder, headers, rng, autosave)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(candidate(username, random.Random(seed + i)) for i, username in enumerate(usernames)))
+    return recorder, time.perf_counter() - started
+
+async def burst(client, usernames, concurrency, password, seed, retries, autosave):
+    recorder = Recorder(retries)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def prepare(username):
+        async with semaphore:
+            return await sign_in(client, recorder, username, password)
+
+    signed_in = [headers for headers in await asyncio.gather(*(prepare(username) for username in usernames)) if headers]
+    # Every candidate starts the exam at the same instant, like a scheduled sitting.
+    started = time.perf_counter()
+    await asyncio.gather(*(take_exam(client, recorder, headers, random.Random(seed + i), autosave) for i, headers in enumerate(signed_in)))
+    return recorder, time.perf_counter() - started
+
+SCENARIOS = {"lifecycle": lifecycle, "burst": burst}
+
+async def run_scenarios(client, args):
+    results = []
+    for scenario in args.scenarios:
+        prefix = f"load{os.getpid()}-{scenario}-{int(time.time())}-"
+        usernames = [f"{prefix}{i}" for i in range(args.candidates)]
+        recorder, elapsed = await SCENARIOS[scenario](
+            client, usernames, args.concurrency, args.password, args.seed, args.retry_429, args.autosave
+        )
+        results.append(recorder.report(scenario, args.candidates, args.concurrency, elapsed))
+    return results
+
+def insert_questions(count):
+    from sqlalchemy import func, insert, select
+    from database import SessionLocal
+    from models import Question
+
+    db = SessionLocal()
+    try:
+        missing = count - db.execute(select(func.count(Question.id))).scalar()
+        if missing > 0:
+            db.execute(insert(Question), [
+                {
+                    "question_text": f"Load test question {i}",
+                    "option_a": "A", "option_b": "B", "option_c": "C", "option_d": "D",
+                    "correct_answer": "ABCD"[i % 4],
+                }
+                for i in range(missing)
+            ])
+            db.commit()
+    finally:
+        db.close()
+
+async def worker_main(args):
+    import httpx
+    import main
+    from create_schema import create_schema
+
+    create_schema()
+    insert_questions(QUESTIONS)
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+            for result in await run_scenarios(client, args):
+                print(json.dumps(result), flush=True)
+
+async def remote_main(args):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=None, limits=limits) as client:
+        return await run_scenarios(client, args)
+
+def print_table(results, baseline):
+    previous = {result["scenario"]: result for result in baseline}
+    print(f"{'scenario':<10} {'endpoint':<8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'rejected':>9} {'p95 vs baseline':>16}")
+    for result in results:
+        for endpoint, row in {**result["endpoints"], "total": result["total"]}.items():
+            change = ""
+            before = previous.get(result["scenario"])
+            if before:
+                before_row = before["total"] if endpoint == "total" else before["endpoints"].get(endpoint)
+                if before_row and before_row["p95_ms"]:
+                    change = f"{(row['p95_ms'] / before_row['p95_ms'] - 1) * 100:+.1f}%"
+            print(
+                f"{result['scenario']:<10} {endpoint:<8} {row['throughput_rps']:>8} {row['p50_ms']:>9}"
+                f" {row['p95_ms']:>9} {row['p99_ms']:>9} {row['errors']:>7} {row.get('rejected', 0):>9} {change:>16}"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent candidates going through the whole exam lifecycle")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=["lifecycle", "burst"])
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50, help="Candidates signing in at once (lifecycle: whole flow)")
+    parser.add_argument("--password", default="load-test-password")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--autosave", type=int, default=0, help="Autosave this many answers one at a time before submitting")
+    parser.add_argument("--retry-429", type=int, default=0, help="Retry requests turned away with 429 up to N times, honouring Retry-After")
+    parser.add_argument("--base-url", help="Test a running server (e.g. http://localhost:8000) instead of an in-process app")
+    parser.add_argument("--database-url", help="Database for the in-process app instead of a temporary SQLite file")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier --output report to compare p95 latency against")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(worker_main(args))
+        return
+
+    if args.base_url:
+        results = asyncio.run(remote_main(args))
+    else:
+        worker_args = [
+            "--scenarios", *args.scenarios, "--candidates", str(args.candidates),
+            "--concurrency", str(args.concurrency), "--password", args.password, "--seed", str(args.seed),
+            "--retry-429", str(args.retry_429), "--autosave", str(args.autosave),
+        ]
+        results = run_worker("benchmarks.load_test", worker_args, {"DATABASE_URL": scratch_database_url(args.database_url)})
+
+    baseline = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    print_table(results, baseline)
+
+    report = {"target": args.base_url or "in-process", "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+from sqlalchemy import create_engine, func, insert, select
+from config import settings
+from models import Base, User, Question, Exam, ExamAnswer
+
+OPTIONS = "ABCD"
+
+def insert_batches(engine, table, rows, batch_size):
+    total = 0
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return total
+        with engine.begin() as conn:
+            conn.execute(insert(table), batch)
+        total += len(batch)
+
+def next_id(engine, table):
+    with engine.connect() as conn:
+        return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+def generate(engine, users, exams_per_user, answers_per_exam, questions, incomplete_ratio, batch_size, seed):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    first_user = next_id(engine, User.__table__)
+    first_question = next_id(engine, Question.__table__)
+    first_exam = next_id(engine, Exam.__table__)
+    first_answer = next_id(engine, ExamAnswer.__table__)
+
+    question_rows = (
+        {
+            "id": first_question + i,
+            "question_text": f"Scale question {first_question + i}",
+            "option_a": "Option A", "option_b": "Option B",
+            "option_c": "Option C", "option_d": "Option D",
+            "correct_answer": OPTIONS[i % 4],
+        }
+        for i in range(questions)
+    )
+    user_rows = (
+        {
+            "id": first_user + i,
+            "email": f"scale{first_user + i}@example.com",
+            "username": f"scale{first_user + i}",
+            "hashed_password": "!",
+        }
+        for i in range(users)
+    )
+
+    answers = []
+
+    def exam_rows():
+        exam_id = first_exam
+        answer_id = first_answer
+        for user_offset in range(users):
+            for attempt in range(exams_per_user):
+                start_time = now - timedelta(minutes=rng.randint(30, 525600))
+                last_attempt = attempt == exams_per_user - 1
+                if last_attempt and rng.random() < incomplete_ratio:
+                    yield {
+                        "id": exam_id, "user_id": first_user + user_offset, "start_time": start_time,
+                        "end_time": None, "is_completed": False, "score": None,
+                        "total_questions": answers_per_exam, "correct_answers": 0,
+                    }
+                    exam_id += 1
+                    continue
+
+                correct = 0
+                for offset in rng.sample(range(questions), min(answers_per_exam, questions)):
+                    question_id = first_question + offset
+                    selected = OPTIONS[rng.randrange(4)]
+                    is_correct = selected == OPTIONS[(question_id - first_question) % 4]
+                    correct += is_correct
+                    answers.append({
+                        "id": answer_id, "exam_id": exam_id, "question_id": question_id,
+                        "selected_answer": selected, "is_correct": is_correct,
+                    })
+                    answer_id += 1
+                yield {
+                    "id": exam_id, "user_id": first_user + user_offset, "start_time": start_time,
+                    "end_time": start_time + timedelta(minutes=rng.randint(5, 30)), "is_completed": True,
+                    "score": correct / answers_per_exam * 100 if answers_per_exam else 0,
+                    "total_questions": answers_per_exam, "correct_answers": correct,
+                }
+                exam_id += 1
+
+    started = time.perf_counter()
+    counts = {
+        "questions": insert_batches(engine, Question.__table__, question_rows, batch_size),
+        "users": insert_batches(engine, User.__table__, user_rows, batch_size),
+        "exams": 0,
+        "exam_answers": 0,
+    }
+
+    exams = exam_rows()
+    while True:
+        batch = list(islice(exams, batch_size))
+        if not batch:
+            break
+        with engine.begin() as conn:
+            conn.execute(insert(Exam.__table__), batch)
+            if answers:
+                conn.execute(insert(ExamAnswer.__table__), answers)
+        counts["exams"] += len(batch)
+        counts["exam_answers"] += len(answers)
+        answers.clear()
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(", ".join(f"{count} {name}" for name, count in counts.items()))
+    print(f"Inserted {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/sec)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the exam schema with synthetic data at scale")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--exams-per-user", type=int, default=5)
+    parser.add_argument("--answers-per-exam", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--incomplete-ratio", type=float, default=0.05, help="Share of users whose latest exam is left in progress")
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    generate(
+        engine, args.users, args.exams_per_user, args.answers_per_exam, args.questions,
+        args.incomplete_ratio, args.batch_size, args.seed,
+    )
+
+if __name__ == "__main__":
+    main()
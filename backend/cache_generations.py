@@ -0,0 +1,120 @@
+import threading
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal, dialect_insert
+from metrics import registry, Counter
+from models import CacheGeneration
+
+QUESTIONS = "questions"
+USERS = "users"
+
+cache_generation_invalidations = registry.register(Counter(
+    "exam_app_cache_generation_invalidations_total", "Local caches dropped because another worker changed their domain",
+    ("domain",)))
+cache_generation_errors = registry.register(Counter(
+    "exam_app_cache_generation_errors_total", "Generation polls that failed"))
+
+_listeners: Dict[str, List[Callable[[], None]]] = {}
+
+def on_generation_changed(domain: str):
+    def register(listener):
+        _listeners.setdefault(domain, []).append(listener)
+        return listener
+    return register
+
+def bump_generation(connection, domain: str) -> int:
+    statement = dialect_insert(connection.dialect.name, CacheGeneration)
+    if statement is None:
+        current = connection.execute(
+            select(CacheGeneration.generation).where(CacheGeneration.domain == domain).with_for_update()
+        ).scalar()
+        if current is None:
+            connection.execute(CacheGeneration.__table__.insert().values(domain=domain, generation=1))
+            return 1
+        connection.execute(
+            update(CacheGeneration).where(CacheGeneration.domain == domain).values(generation=current + 1)
+        )
+        return current + 1
+
+    return connection.execute(
+        statement.values(domain=domain, generation=1).on_conflict_do_update(
+            index_elements=[CacheGeneration.domain],
+            set_={"generation": CacheGeneration.generation + 1}
+        ).returning(CacheGeneration.generation)
+    ).scalar_one()
+
+def mark_changed(session: Session, domain: str):
+    # Bump once per transaction, so the new generation commits (or rolls back) with the change itself.
+    bumped = session.info.setdefault("generation_bumps", {})
+    if domain not in bumped:
+        bumped[domain] = bump_generation(session.connection(), domain)
+
+@event.listens_for(Session, "after_commit")
+def _record_local_bumps(session):
+    for domain, generation in session.info.pop("generation_bumps", {}).items():
+        generation_watcher.committed_locally(domain, generation)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_local_bumps(session):
+    session.info.pop("generation_bumps", None)
+
+class GenerationWatcher:
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.poll_seconds <= 0 or self._thread is not None:
+            return
+        self.check()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-generations", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout=5)
+
+    def committed_locally(self, domain: str, generation: int):
+        # Our own commits already invalidated precisely; don't drop everything when the poll sees them.
+        with self._lock:
+            if self._seen.get(domain) == generation - 1:
+                self._seen[domain] = generation
+
+    def check(self):
+        db = SessionLocal()
+        try:
+            current = dict(db.execute(select(CacheGeneration.domain, CacheGeneration.generation)).all())
+        finally:
+            db.close()
+
+        changed = []
+        with self._lock:
+            for domain in _listeners:
+                generation = current.get(domain, 0)
+                seen = self._seen.get(domain)
+                if seen is not None and generation != seen:
+                    changed.append(domain)
+                self._seen[domain] = generation
+
+        for domain in changed:
+            cache_generation_invalidations.inc((domain,))
+            for listener in _listeners[domain]:
+                listener()
+
+    def _run(self):
+        while not self._stopping.wait(self.poll_seconds):
+            try:
+                self.check()
+            except Exception:
+                cache_generation_errors.inc()
+
+generation_watcher = GenerationWatcher(settings.cache_generation_poll_ms / 1000)
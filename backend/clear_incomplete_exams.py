@@ -1,46 +1,43 @@
-from sqlalchemy.orm import Session
+import argparse
+from datetime import timedelta
+from config import settings
 from database import SessionLocal
-from models import Exam, ExamAnswer
+from exam_reaper import reap_stale_exams
+from models import User
 
-def clear_incomplete_exams(username: str = "testuser"):
+def clear_incomplete_exams(max_age_hours: float, batch_size: int, username: str = None):
     db = SessionLocal()
-    
+
     try:
-        from models import User
-        user = db.query(User).filter(User.username == username).first()
-        
-        if not user:
-            print(f"User '{username}' not found")
-            return
-        
-        incomplete_exams = db.query(Exam).filter(
-            Exam.user_id == user.id,
-            Exam.is_completed == False
-        ).all()
-        
-        if not incomplete_exams:
-            print(f"No incomplete exams found for user '{username}'")
-            return
-        
-        print(f"Found {len(incomplete_exams)} incomplete exam(s) for user '{username}'")
-        
-        for exam in incomplete_exams:
-            exam_answers = db.query(ExamAnswer).filter(ExamAnswer.exam_id == exam.id).all()
-            for answer in exam_answers:
-                db.delete(answer)
-            print(f"Deleted {len(exam_answers)} answers for exam {exam.id}")
-        
-        for exam in incomplete_exams:
-            db.delete(exam)
-        
-        db.commit()
-        print(f"Successfully cleared {len(incomplete_exams)} incomplete exam(s) for user '{username}'")
-        
+        user_id = None
+        if username:
+            user_id = db.query(User.id).filter(User.username == username).scalar()
+            if user_id is None:
+                print(f"User '{username}' not found")
+                return
+
+        report = reap_stale_exams(db, timedelta(hours=max_age_hours), batch_size, user_id)
+        scope = f"user '{username}'" if username else "all users"
+        print(
+            f"Deleted {report.exams} incomplete exam(s) and {report.answers} answer(s) older than "
+            f"{max_age_hours:g}h for {scope} in {report.batches} batch(es), "
+            f"{report.seconds:.2f}s ({report.rows_per_second:.0f} rows/s)"
+        )
+
     except Exception as e:
         print(f"Error clearing incomplete exams: {e}")
         db.rollback()
     finally:
         db.close()
 
+def main():
+    parser = argparse.ArgumentParser(description="Delete incomplete exams (and their answers) older than a given age")
+    parser.add_argument("--max-age-hours", type=float, default=settings.stale_exam_max_age_hours,
+                        help="Only delete exams started at least this many hours ago (0 = all incomplete exams)")
+    parser.add_argument("--batch-size", type=int, default=settings.stale_exam_batch_size)
+    parser.add_argument("--username", help="Only clear this user's exams")
+    args = parser.parse_args()
+    clear_incomplete_exams(args.max_age_hours, args.batch_size, args.username)
+
 if __name__ == "__main__":
-    clear_incomplete_exams()
+    main()
@@ -7,11 +7,68 @@ load_dotenv()
 
 class Settings(BaseSettings):
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./exam_app.db")
+    async_database: bool = os.getenv("ASYNC_DATABASE", "False").lower() == "true"
+    async_database_url: str = os.getenv("ASYNC_DATABASE_URL", "")
+    
+    create_schema_on_startup: bool = os.getenv("CREATE_SCHEMA_ON_STARTUP", "True").lower() == "true"
+    
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "False").lower() == "true"
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    
+    sqlite_profile: str = os.getenv("SQLITE_PROFILE", "default")
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
     
     jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "your-super-secret-jwt-key-change-this-in-production")
     jwt_algorithm: str = os.getenv("JWT_ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     
+    token_cache_size: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    token_cache_ttl_seconds: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+    
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    hash_workers: int = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+    hash_queue_size: int = int(os.getenv("HASH_QUEUE_SIZE", "64"))
+    hash_retry_after_seconds: int = int(os.getenv("HASH_RETRY_AFTER_SECONDS", "1"))
+    
+    history_page_size: int = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+    history_max_page_size: int = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "500"))
+    results_cache_size: int = int(os.getenv("RESULTS_CACHE_SIZE", "10000"))
+    results_cache_max_age: int = int(os.getenv("RESULTS_CACHE_MAX_AGE", "86400"))
+    
+    admission_start_limit: int = int(os.getenv("ADMISSION_START_LIMIT", "16"))
+    admission_submit_limit: int = int(os.getenv("ADMISSION_SUBMIT_LIMIT", "16"))
+    admission_queue_size: int = int(os.getenv("ADMISSION_QUEUE_SIZE", "500"))
+    admission_max_wait_seconds: float = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "15"))
+    
+    question_set_pool_size: int = int(os.getenv("QUESTION_SET_POOL_SIZE", "200"))
+    question_set_low_water: int = int(os.getenv("QUESTION_SET_LOW_WATER", "50"))
+    
+    stale_exam_max_age_hours: float = float(os.getenv("STALE_EXAM_MAX_AGE_HOURS", "24"))
+    stale_exam_batch_size: int = int(os.getenv("STALE_EXAM_BATCH_SIZE", "500"))
+    stale_exam_reap_interval_seconds: float = float(os.getenv("STALE_EXAM_REAP_INTERVAL_SECONDS", "0"))
+    
+    autosave_flush_interval_ms: int = int(os.getenv("AUTOSAVE_FLUSH_INTERVAL_MS", "1000"))
+    autosave_max_buffered: int = int(os.getenv("AUTOSAVE_MAX_BUFFERED", "10000"))
+    
+    cache_generation_poll_ms: int = int(os.getenv("CACHE_GENERATION_POLL_MS", "1000"))
+    
+    score_distribution_refresh_seconds: float = float(os.getenv("SCORE_DISTRIBUTION_REFRESH_SECONDS", "60"))
+    leaderboard_size: int = int(os.getenv("LEADERBOARD_SIZE", "10"))
+    leaderboard_max_size: int = int(os.getenv("LEADERBOARD_MAX_SIZE", "100"))
+    
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    
+    profiling_enabled: bool = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+    profiling_token: str = os.getenv("PROFILING_TOKEN", "")
+    profiling_sample_rate: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    profiling_dir: str = os.getenv("PROFILING_DIR", "profiles")
+    profiling_max_files: int = int(os.getenv("PROFILING_MAX_FILES", "100"))
+    
     debug: bool = os.getenv("DEBUG", "True").lower() == "true"
     allowed_hosts: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
     
@@ -0,0 +1,21 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from database import engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+BASELINE_REVISION = "40fb52cf3fd5"
+
+def create_schema(configure_logger: bool = False):
+    config = Config(ALEMBIC_INI)
+    config.attributes["configure_logger"] = configure_logger
+    tables = inspect(engine).get_table_names()
+    if "users" in tables and "alembic_version" not in tables:
+        # Made by create_all before migrations existed; the revisions skip whatever it already has.
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+if __name__ == "__main__":
+    create_schema(configure_logger=True)
+    print(f"Schema at head on {engine.url.render_as_string(hide_password=True)}")
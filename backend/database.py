@@ -1,16 +1,118 @@
-from sqlalchemy import create_engine
+from functools import wraps
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from config import settings
 
-engine = create_engine(settings.database_url)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+SQLITE_PROFILES = {
+    "default": [],
+    "production": [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size}",
+    ],
+}
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    url = make_url(url)
+    options = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return options
+        if is_async:
+            options["poolclass"] = AsyncAdaptedQueuePool
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+    )
+    if backend == "postgresql" and settings.db_statement_timeout_ms > 0:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
+def apply_sqlite_profile(engine, profile: str = settings.sqlite_profile):
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE '{profile}', expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = SQLITE_PROFILES[profile]
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+def dialect_insert(dialect_name: str, table):
+    # INSERT with ON CONFLICT for the dialects that have it; None tells callers to fall back.
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(table)
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+apply_sqlite_profile(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+if settings.async_database:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    _async_url = settings.async_database_url or async_database_url(settings.database_url)
+    async_engine = create_async_engine(_async_url, **engine_options(_async_url, is_async=True))
+    apply_sqlite_profile(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
-def get_db():
+# An async generator so the session is closed on the event loop: closing it in a
+# worker thread deadlocks once every thread is waiting for a pooled connection.
+async def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+# Handler logic runs in a worker thread, and the response is serialized and the session closed
+# after another hop; end the transaction on every exit so the pooled connection is free meanwhile.
+def releases_connection(logic):
+    @wraps(logic)
+    def run(db: Session, *args, **kwargs):
+        try:
+            return logic(db, *args, **kwargs)
+        finally:
+            if db.in_transaction():
+                db.rollback()
+    return run
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
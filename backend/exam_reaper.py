@@ -0,0 +1,108 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal
+from metrics import registry, Counter
+from models import Exam, ExamAnswer
+
+reaped_rows = registry.register(Counter(
+    "exam_app_reaper_deleted_rows_total", "Rows deleted by the stale exam reaper", ("table",)))
+reaper_errors = registry.register(Counter(
+    "exam_app_reaper_errors_total", "Stale exam reaper runs that failed"))
+
+class ReapReport(NamedTuple):
+    exams: int
+    answers: int
+    batches: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return (self.exams + self.answers) / self.seconds if self.seconds > 0 else 0.0
+
+def _reap_batch(db: Session, cutoff: datetime, batch_size: int, user_id: Optional[int] = None):
+    query = select(Exam.id).where(Exam.is_completed == False, Exam.start_time < cutoff)
+    if user_id is not None:
+        query = query.where(Exam.user_id == user_id)
+    # Skip exams a concurrent submit has locked; they are no longer stale.
+    exam_ids = db.execute(query.limit(batch_size).with_for_update(skip_locked=True)).scalars().all()
+    if not exam_ids:
+        return 0, 0, 0
+
+    # SQLite has no row locks, so re-check the selected exams are still incomplete. The guard runs on
+    # the ids, not as `is_completed = 0`, which the planner would serve by walking every incomplete exam.
+    stale = select(Exam.id).where(Exam.id.in_(exam_ids), Exam.is_completed != True)
+    answers = db.execute(
+        delete(ExamAnswer).where(ExamAnswer.exam_id.in_(stale)).execution_options(synchronize_session=False)
+    ).rowcount
+    exams = db.execute(
+        delete(Exam).where(Exam.id.in_(stale)).execution_options(synchronize_session=False)
+    ).rowcount
+    return len(exam_ids), exams, answers
+
+def reap_stale_exams(db: Session, max_age: timedelta, batch_size: int, user_id: Optional[int] = None) -> ReapReport:
+    cutoff = datetime.utcnow() - max_age
+    started = time.perf_counter()
+    total_exams = total_answers = batches = 0
+    while True:
+        selected, exams, answers = _reap_batch(db, cutoff, batch_size, user_id)
+        db.commit()
+        if not selected:
+            break
+        batches += 1
+        total_exams += exams
+        total_answers += answers
+        reaped_rows.inc(("exams",), exams)
+        reaped_rows.inc(("exam_answers",), answers)
+        if selected < batch_size:
+            break
+    return ReapReport(total_exams, total_answers, batches, time.perf_counter() - started)
+
+class ExamReaper:
+    def __init__(self, interval_seconds: float, max_age: timedelta, batch_size: int):
+        self.interval_seconds = interval_seconds
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="stale-exam-reaper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout=5)
+
+    def run_once(self) -> ReapReport:
+        db = SessionLocal()
+        try:
+            return reap_stale_exams(db, self.max_age, self.batch_size)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                reaper_errors.inc()
+
+exam_reaper = ExamReaper(
+    settings.stale_exam_reap_interval_seconds,
+    timedelta(hours=settings.stale_exam_max_age_hours),
+    settings.stale_exam_batch_size,
+)
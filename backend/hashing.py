@@ -0,0 +1,111 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from config import settings
+from metrics import registry, Counter, Gauge, Histogram, LATENCY_BUCKETS
+
+hash_duration = registry.register(Histogram(
+    "exam_app_hash_duration_seconds", "Time a password hash or verify took, including its wait for a worker",
+    LATENCY_BUCKETS))
+hash_rejected = registry.register(Counter(
+    "exam_app_hash_rejected_total", "Password hashes turned away with 503 because the queue was full"))
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    # passlib is only needed once someone registers or logs in, so keep it off the import path.
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+def hash_password(password: str) -> str:
+    return get_pwd_context().hash(password)
+
+def verify_and_update_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return get_pwd_context().verify_and_update(password, hashed_password)
+
+class HashingExecutor:
+    def __init__(self, workers: int, max_pending: int, retry_after_seconds: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after_seconds = retry_after_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    @property
+    def queue_depth(self):
+        return self._pending
+
+    def start(self):
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                hash_rejected.inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication is busy, please retry shortly",
+                    headers={"Retry-After": str(self.retry_after_seconds)},
+                )
+            self._pending += 1
+
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.start(), fn, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._latency_total += elapsed
+                self._latency_max = max(self._latency_max, elapsed)
+            hash_duration.observe(elapsed)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self._pending,
+                "queue_limit": self.max_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "latency_avg_ms": round(self._latency_total / self._completed * 1000, 2) if self._completed else 0.0,
+                "latency_max_ms": round(self._latency_max * 1000, 2),
+            }
+
+hash_executor = HashingExecutor(
+    workers=settings.hash_workers,
+    max_pending=settings.hash_queue_size,
+    retry_after_seconds=settings.hash_retry_after_seconds,
+)
+
+registry.register(Gauge(
+    "exam_app_hash_queue_depth", "Password hashes running or waiting for a worker", lambda: hash_executor.queue_depth))
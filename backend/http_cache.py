@@ -0,0 +1,68 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from fastapi import Request, Response
+from config import settings
+
+RESULTS_CACHE_CONTROL = f"private, max-age={settings.results_cache_max_age}, immutable"
+HISTORY_CACHE_CONTROL = "private, no-cache"
+
+def etag_for(value: bytes) -> str:
+    return '"' + hashlib.sha256(value).hexdigest()[:32] + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+def cached_json_response(request: Request, body: bytes, etag: str, cache_control: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+class CachedResult(NamedTuple):
+    user_id: int
+    body: bytes
+    etag: str
+
+class ResultCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, CachedResult]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, exam_id: int, user_id: int) -> Optional[CachedResult]:
+        with self._lock:
+            entry = self._entries.get(exam_id)
+            if entry is None or entry.user_id != user_id:
+                return None
+            self._entries.move_to_end(exam_id)
+            return entry
+
+    def put(self, exam_id: int, user_id: int, body: bytes) -> CachedResult:
+        entry = CachedResult(user_id, body, etag_for(body))
+        if self.maxsize <= 0:
+            return entry
+        with self._lock:
+            self._entries[exam_id] = entry
+            self._entries.move_to_end(exam_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def discard(self, exam_id: int):
+        with self._lock:
+            self._entries.pop(exam_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+results_cache = ResultCache(settings.results_cache_size)
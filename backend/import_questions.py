@@ -0,0 +1,149 @@
+import argparse
+import csv
+import hashlib
+import json
+import time
+from itertools import islice
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from database import engine, dialect_insert
+from models import Question
+from create_schema import create_schema
+from schemas import QuestionBase
+from question_cache import notify_questions_changed
+from cache_generations import QUESTIONS, bump_generation, generation_watcher
+
+ANSWER_LETTERS = {"A", "B", "C", "D"}
+MAX_REPORTED_ERRORS = 20
+
+class ImportReport:
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+
+    @property
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.read / elapsed if elapsed else 0.0
+
+    def summary(self):
+        return (
+            f"{self.read} rows read, {self.inserted} inserted, {self.duplicates} duplicates, "
+            f"{self.invalid} invalid, {self.failed} in failed batches "
+            f"in {time.perf_counter() - self.started:.1f}s ({self.rate:.0f} rows/sec)"
+        )
+
+def content_hash(question: QuestionBase) -> str:
+    fields = (question.question_text, question.option_a, question.option_b, question.option_c, question.option_d)
+    return hashlib.sha256("\x1f".join(field.strip() for field in fields).encode()).hexdigest()
+
+def read_rows(path: str, file_format: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield line_number, row
+            return
+        for line_number, line in enumerate(f, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, e
+
+def validate(row):
+    if isinstance(row, Exception):
+        raise ValueError(f"invalid JSON: {row}")
+    question = QuestionBase.model_validate(row)
+    blank = [name for name, value in question.model_dump().items() if not value.strip()]
+    if blank:
+        raise ValueError(f"blank {', '.join(blank)}")
+    correct_answer = str(row.get("correct_answer") or "").strip().upper()
+    if correct_answer not in ANSWER_LETTERS:
+        raise ValueError(f"correct_answer must be one of A, B, C, D, got {row.get('correct_answer')!r}")
+    return {
+        **question.model_dump(),
+        "correct_answer": correct_answer,
+        "content_hash": content_hash(question),
+    }
+
+def insert_batch(conn, rows):
+    statement = dialect_insert(conn.dialect.name, Question)
+    if statement is not None:
+        statement = statement.on_conflict_do_nothing(index_elements=[Question.content_hash])
+    else:
+        existing = set(conn.execute(
+            select(Question.content_hash).where(Question.content_hash.in_([row["content_hash"] for row in rows]))
+        ).scalars())
+        rows = [row for row in rows if row["content_hash"] not in existing]
+        if not rows:
+            return []
+        statement = insert(Question)
+    return conn.execute(statement.returning(Question.id), rows).scalars().all()
+
+def import_questions(path: str, file_format: str = None, batch_size: int = 5000, progress_every: int = 100000):
+    file_format = file_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    report = ImportReport()
+    errors_reported = 0
+    rows = read_rows(path, file_format)
+    next_progress = progress_every
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        batch = {}
+        for line_number, row in chunk:
+            report.read += 1
+            try:
+                question = validate(row)
+            except (ValidationError, ValueError) as e:
+                report.invalid += 1
+                if errors_reported < MAX_REPORTED_ERRORS:
+                    print(f"line {line_number}: {e}".replace("\n", " "))
+                    errors_reported += 1
+                continue
+            if question["content_hash"] in batch:
+                report.duplicates += 1
+                continue
+            batch[question["content_hash"]] = question
+        if not batch:
+            continue
+
+        try:
+            with engine.begin() as conn:
+                inserted = insert_batch(conn, list(batch.values()))
+                generation = bump_generation(conn, QUESTIONS) if inserted else None
+        except SQLAlchemyError as e:
+            report.failed += len(batch)
+            print(f"Batch ending at row {report.read} failed and was skipped: {getattr(e, 'orig', e)}".replace("\n", " "))
+            continue
+
+        report.inserted += len(inserted)
+        report.duplicates += len(batch) - len(inserted)
+        if inserted:
+            generation_watcher.committed_locally(QUESTIONS, generation)
+            notify_questions_changed(added=inserted)
+        if progress_every and report.read >= next_progress:
+            print(f"... {report.read} rows, {report.rate:.0f} rows/sec")
+            next_progress += progress_every
+
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream questions from a CSV or JSONL file into the question bank")
+    parser.add_argument("path", help="CSV with a header row, or JSON Lines, with question_text, option_a-d and correct_answer")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per insert and per transaction")
+    args = parser.parse_args()
+
+    create_schema()
+    report = import_questions(args.path, args.format, args.batch_size)
+    print(report.summary())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from create_schema import create_schema
+from models import Exam, ExamAnswer, ItemStats, AnalysisWatermark
+
+WATERMARK = "item_stats"
+WRITE_BATCH = 1000
+SUMS = (
+    "responses", "correct",
+    "option_a_count", "option_b_count", "option_c_count", "option_d_count",
+    "score_sum", "score_square_sum", "correct_score_sum",
+)
+
+def reduce_chunk(rows):
+    question_ids, selected, is_correct, scores = zip(*rows)
+    question_ids = np.fromiter(question_ids, dtype=np.int64, count=len(rows))
+    options = np.array(selected, dtype="U1").view(np.uint32).astype(np.int64) - ord("A")
+    correct = np.array(is_correct, dtype=bool)
+    scores = np.nan_to_num(np.array(scores, dtype=np.float64))
+
+    ids, inverse = np.unique(question_ids, return_inverse=True)
+    m = len(ids)
+    sums = np.zeros((m, len(SUMS)))
+    sums[:, 0] = np.bincount(inverse, minlength=m)
+    sums[:, 1] = np.bincount(inverse, weights=correct, minlength=m)
+    valid = (options >= 0) & (options < 4)
+    sums[:, 2:6] = np.bincount(inverse[valid] * 4 + options[valid], minlength=m * 4).reshape(m, 4)
+    sums[:, 6] = np.bincount(inverse, weights=scores, minlength=m)
+    sums[:, 7] = np.bincount(inverse, weights=scores * scores, minlength=m)
+    sums[:, 8] = np.bincount(inverse, weights=scores * correct, minlength=m)
+    return ids, sums
+
+def merge(ids, sums, more_ids, more_sums):
+    merged_ids, inverse = np.unique(np.concatenate([ids, more_ids]), return_inverse=True)
+    stacked = np.vstack([sums, more_sums])
+    merged = np.empty((len(merged_ids), len(SUMS)))
+    for column in range(len(SUMS)):
+        merged[:, column] = np.bincount(inverse, weights=stacked[:, column], minlength=len(merged_ids))
+    return merged_ids, merged
+
+def derive(sums):
+    n, correct, score_sum, square_sum, correct_score_sum = (sums[:, i] for i in (0, 1, 6, 7, 8))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        difficulty = np.where(n > 0, correct / n, np.nan)
+        # Point-biserial correlation between answering correctly and the exam score.
+        spread = (n * correct - correct * correct) * (n * square_sum - score_sum * score_sum)
+        discrimination = np.where(spread > 0, (n * correct_score_sum - correct * score_sum) / np.sqrt(spread), np.nan)
+    return difficulty, discrimination
+
+def next_watermark(db: Session, since, until):
+    completed = [Exam.is_completed == True, Exam.end_time <= until]
+    if since:
+        completed.append(tuple_(Exam.end_time, Exam.id) > tuple_(*since))
+    last_end_time = db.execute(select(func.max(Exam.end_time)).where(*completed)).scalar()
+    if last_end_time is None:
+        return None
+    last_exam_id = db.execute(
+        select(func.max(Exam.id)).where(*completed, Exam.end_time == last_end_time)
+    ).scalar()
+    return last_end_time, last_exam_id
+
+def collect(db: Session, since, until, chunk_size: int):
+    query = select(
+        ExamAnswer.question_id, ExamAnswer.selected_answer, ExamAnswer.is_correct, Exam.score
+    ).join(Exam, Exam.id == ExamAnswer.exam_id).where(
+        Exam.is_completed == True,
+        tuple_(Exam.end_time, Exam.id) <= tuple_(*until)
+    )
+    if since:
+        query = query.where(tuple_(Exam.end_time, Exam.id) > tuple_(*since))
+
+    ids, sums = np.empty(0, dtype=np.int64), np.empty((0, len(SUMS)))
+    answers = 0
+    for chunk in db.execute(query.execution_options(yield_per=chunk_size)).partitions():
+        answers += len(chunk)
+        ids, sums = merge(ids, sums, *reduce_chunk(chunk))
+    return ids, sums, answers
+
+def write_stats(db: Session, ids, sums):
+    now = datetime.utcnow()
+    for start in range(0, len(ids), WRITE_BATCH):
+        batch_ids = [int(i) for i in ids[start:start + WRITE_BATCH]]
+        batch = sums[start:start + WRITE_BATCH].copy()
+        existing = db.execute(
+            select(ItemStats.question_id, *(getattr(ItemStats, name) for name in SUMS))
+            .where(ItemStats.question_id.in_(batch_ids))
+        ).all()
+        position = {question_id: i for i, question_id in enumerate(batch_ids)}
+        for row in existing:
+            batch[position[row[0]]] += np.array(row[1:], dtype=np.float64)
+
+        difficulty, discrimination = derive(batch)
+        db.execute(delete(ItemStats).where(ItemStats.question_id.in_(batch_ids)))
+        db.execute(ItemStats.__table__.insert(), [
+            {
+                "question_id": question_id,
+                **{name: float(value) if name.endswith("_sum") else int(value) for name, value in zip(SUMS, batch[i])},
+                "difficulty": None if np.isnan(difficulty[i]) else float(difficulty[i]),
+                "discrimination": None if np.isnan(discrimination[i]) else float(discrimination[i]),
+                "updated_at": now,
+            }
+            for i, question_id in enumerate(batch_ids)
+        ])
+
+def run_item_analysis(db: Session, full: bool = False, chunk_size: int = 50000, lag_seconds: int = 60):
+    watermark = db.get(AnalysisWatermark, WATERMARK)
+    if full:
+        db.execute(delete(ItemStats))
+        if watermark:
+            db.delete(watermark)
+            db.flush()
+        watermark = None
+    since = (watermark.last_end_time, watermark.last_exam_id) if watermark and watermark.last_end_time else None
+
+    # Exams finishing right now may still commit with an earlier end_time; leave them for the next run.
+    until = next_watermark(db, since, datetime.utcnow() - timedelta(seconds=lag_seconds))
+    if until is None:
+        db.commit()
+        return 0, 0
+
+    ids, sums, answers = collect(db, since, until, chunk_size)
+    write_stats(db, ids, sums)
+    if watermark is None:
+        watermark = AnalysisWatermark(name=WATERMARK)
+        db.add(watermark)
+    watermark.last_end_time, watermark.last_exam_id = until
+    db.commit()
+    return answers, len(ids)
+
+def main():
+    parser = argparse.ArgumentParser(description="Update question difficulty, discrimination and option rates in item_stats")
+    parser.add_argument("--full", action="store_true", help="Recompute from every completed exam instead of only new ones")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Answer rows converted to arrays at a time")
+    parser.add_argument("--lag-seconds", type=int, default=60, help="Skip exams completed in the last N seconds")
+    args = parser.parse_args()
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        answers, questions = run_item_analysis(db, args.full, args.chunk_size, args.lag_seconds)
+        elapsed = time.perf_counter() - started
+        rate = f" ({answers / elapsed:.0f} answers/sec)" if answers else ""
+        print(f"Analyzed {answers} answers across {questions} question(s) in {elapsed:.1f}s{rate}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,68 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine
-from models import Base
+from database import engine, async_engine
 from routers import auth, exams
 from config import settings
+from hashing import hash_executor
+from cache_generations import generation_watcher
+from question_sets import question_sets
+from exam_reaper import exam_reaper
+from answer_buffer import answer_buffer
+from score_distribution import score_distribution
+from admission import AdmissionMiddleware, admission_controllers
+from startup import warm_up
+from profiling import ProfilingMiddleware
+from metrics import registry, instrument_engine, MetricsMiddleware, PROMETHEUS_CONTENT_TYPE
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.create_schema_on_startup:
+        # Imported here so workers that skip migrations never load alembic.
+        from create_schema import create_schema
+        await run_in_threadpool(create_schema)
+    hash_executor.start()
+    generation_watcher.start()
+    question_sets.start()
+    exam_reaper.start()
+    answer_buffer.start()
+    score_distribution.start()
+    warming = asyncio.create_task(warm_up())
+    yield
+    if not warming.done():
+        warming.cancel()
+    score_distribution.stop()
+    answer_buffer.stop()
+    exam_reaper.stop()
+    question_sets.stop()
+    generation_watcher.stop()
+    hash_executor.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(
     title="Exam Taking Application",
     description="A full-stack exam-taking interface with JWT authentication",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+if admission_controllers:
+    app.add_middleware(AdmissionMiddleware)
+
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_hosts,
@@ -21,8 +71,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(auth.router, prefix="/auth", tags=["authentication"])
-app.include_router(exams.router, prefix="/exams", tags=["exams"])
+if settings.async_database:
+    app.include_router(auth.async_router, prefix="/auth", tags=["authentication"])
+    app.include_router(exams.async_router, prefix="/exams", tags=["exams"])
+else:
+    app.include_router(auth.router, prefix="/auth", tags=["authentication"])
+    app.include_router(exams.router, prefix="/exams", tags=["exams"])
 
 @app.get("/")
 def read_root():
@@ -30,4 +84,9 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "hashing": hash_executor.metrics(), "question_sets": question_sets.metrics()}
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,202 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in values.items():
+            yield f"{self.name}{_format_labels(self.labels, labels)} {value}"
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...], labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, labels: tuple = ()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            values = {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+        for labels, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels((*self.labels, 'le'), (*labels, bound))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, labels)} {total}"
+            yield f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}"
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, read: Callable, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.read = read
+        self.labels = labels
+
+    def samples(self):
+        if not self.labels:
+            yield f"{self.name} {self.read()}"
+            return
+        for labels, value in self.read().items():
+            yield f"{self.name}{_format_labels(self.labels, labels)} {value}"
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+requests_total = registry.register(Counter(
+    "exam_app_requests_total", "HTTP requests handled", ("method", "route", "status")))
+request_duration = registry.register(Histogram(
+    "exam_app_request_duration_seconds", "HTTP request latency", LATENCY_BUCKETS, ("method", "route")))
+request_queries = registry.register(Histogram(
+    "exam_app_request_db_queries", "SQL statements issued per HTTP request", QUERY_COUNT_BUCKETS, ("method", "route")))
+request_db_seconds = registry.register(Counter(
+    "exam_app_request_db_seconds_total", "Time spent executing SQL on behalf of HTTP requests", ("method", "route")))
+query_duration = registry.register(Histogram(
+    "exam_app_db_query_duration_seconds", "SQL statement execution time", LATENCY_BUCKETS))
+pool_checkout_wait = registry.register(Histogram(
+    "exam_app_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", LATENCY_BUCKETS))
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        query_duration.observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    # QueuePool has no "before checkout" event, so time the blocking get itself.
+    pool = engine.pool
+    do_get = pool._do_get
+
+    def _timed_do_get():
+        started = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started)
+
+    pool._do_get = _timed_do_get
+
+_route_paths: Optional[Dict[Callable, str]] = None
+
+def route_label(scope) -> str:
+    global _route_paths
+    if _route_paths is None:
+        _route_paths = {
+            route.endpoint: route.path
+            for route in scope["app"].routes
+            if hasattr(route, "endpoint")
+        }
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        # Middleware that answers before routing (admission control's 429s) leaves no endpoint.
+        for route in scope["app"].routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                endpoint = child_scope.get("endpoint")
+                break
+    return _route_paths.get(endpoint, "unmatched")
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            labels = (scope["method"], route_label(scope))
+            requests_total.inc((*labels, str(status_code)))
+            request_duration.observe(elapsed, labels)
+            request_queries.observe(stats.queries, labels)
+            request_db_seconds.inc(labels, stats.db_seconds)
@@ -0,0 +1,52 @@
+"""add item_stats and analysis_watermarks
+
+Revision ID: 23c7c501f233
+Revises: 6986c5b1431e
+Create Date: 2026-10-18 19:00:20.593334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '23c7c501f233'
+down_revision: Union[str, None] = '6986c5b1431e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('item_stats'):
+        op.create_table('item_stats',
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('responses', sa.Integer(), nullable=False),
+        sa.Column('correct', sa.Integer(), nullable=False),
+        sa.Column('option_a_count', sa.Integer(), nullable=False),
+        sa.Column('option_b_count', sa.Integer(), nullable=False),
+        sa.Column('option_c_count', sa.Integer(), nullable=False),
+        sa.Column('option_d_count', sa.Integer(), nullable=False),
+        sa.Column('score_sum', sa.Float(), nullable=False),
+        sa.Column('score_square_sum', sa.Float(), nullable=False),
+        sa.Column('correct_score_sum', sa.Float(), nullable=False),
+        sa.Column('difficulty', sa.Float(), nullable=True),
+        sa.Column('discrimination', sa.Float(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+        sa.PrimaryKeyConstraint('question_id')
+        )
+    if not inspector.has_table('analysis_watermarks'):
+        op.create_table('analysis_watermarks',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('last_end_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_exam_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('analysis_watermarks')
+    op.drop_table('item_stats')
@@ -0,0 +1,37 @@
+"""index hot exam queries
+
+Revision ID: 28273c3c82d9
+Revises: 40fb52cf3fd5
+Create Date: 2026-10-18 19:00:14.622786
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '28273c3c82d9'
+down_revision: Union[str, None] = '40fb52cf3fd5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('exams', 'ix_exams_user_id_is_completed_end_time', ['user_id', 'is_completed', 'end_time']),
+    ('exams', 'ix_exams_is_completed_end_time', ['is_completed', 'end_time']),
+    ('exam_answers', 'ix_exam_answers_exam_id', ['exam_id']),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, name, columns in INDEXES:
+        if name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for table, name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
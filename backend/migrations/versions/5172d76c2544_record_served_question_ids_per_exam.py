@@ -0,0 +1,29 @@
+"""record served question ids per exam
+
+Revision ID: 5172d76c2544
+Revises: 28273c3c82d9
+Create Date: 2026-10-18 19:00:16.587482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5172d76c2544'
+down_revision: Union[str, None] = '28273c3c82d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'question_ids' not in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('exams')}:
+        # Exams started before this have no recorded questions and are graded as before.
+        op.add_column('exams', sa.Column('question_ids', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('exams') as batch_op:
+        batch_op.drop_column('question_ids')
@@ -0,0 +1,70 @@
+"""backfill exam percentiles
+
+Revision ID: 63f9f37526cd
+Revises: ff30800ef756
+Create Date: 2026-10-18 19:15:17.935799
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '63f9f37526cd'
+down_revision: Union[str, None] = 'ff30800ef756'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# As in score_distribution.py: scores bucketed to hundredths, counted in a Fenwick tree.
+SCORE_SCALE = 100
+SCORE_BUCKETS = 100 * SCORE_SCALE + 1
+UPDATE_BATCH = 1000
+
+exams = sa.table('exams',
+    sa.column('id', sa.Integer()),
+    sa.column('is_completed', sa.Boolean()),
+    sa.column('score', sa.Float()),
+    sa.column('percentile', sa.Float()),
+    sa.column('end_time', sa.DateTime(timezone=True)),
+)
+
+
+def upgrade() -> None:
+    # Give exams completed before percentiles were recorded the value they would have had at
+    # submission: the share of earlier completed exams that scored strictly lower.
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(exams.c.id, exams.c.score, exams.c.percentile)
+        .where(exams.c.is_completed == True, exams.c.score.is_not(None))
+        .order_by(exams.c.end_time, exams.c.id)
+    ).all()
+
+    tree = [0] * (SCORE_BUCKETS + 1)
+    updates = []
+    for earlier, (exam_id, score, percentile) in enumerate(rows):
+        bucket = min(max(int(round(score * SCORE_SCALE)), 0), SCORE_BUCKETS - 1)
+        if percentile is None and earlier:
+            below = 0
+            position = bucket
+            while position > 0:
+                below += tree[position]
+                position -= position & -position
+            updates.append({'exam_id': exam_id, 'value': round(below / earlier * 100, 2)})
+        position = bucket + 1
+        while position <= SCORE_BUCKETS:
+            tree[position] += 1
+            position += position & -position
+
+    statement = (
+        exams.update().where(exams.c.id == sa.bindparam('exam_id'))
+        .values(percentile=sa.bindparam('value'))
+    )
+    for start in range(0, len(updates), UPDATE_BATCH):
+        bind.execute(statement, updates[start:start + UPDATE_BATCH])
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,42 @@
+"""add user_stats
+
+Revision ID: 6986c5b1431e
+Revises: 5172d76c2544
+Create Date: 2026-10-18 19:00:18.623029
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6986c5b1431e'
+down_revision: Union[str, None] = '5172d76c2544'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('user_stats'):
+        return
+    # Empty until `python backfill_user_stats.py` runs; new submissions are counted from here on.
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('best_score', sa.Float(), nullable=True),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('last_score', sa.Float(), nullable=True),
+    sa.Column('correct_answers_sum', sa.Integer(), nullable=False),
+    sa.Column('total_questions_sum', sa.Integer(), nullable=False),
+    sa.Column('last_exam_id', sa.Integer(), nullable=True),
+    sa.Column('last_completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['last_exam_id'], ['exams.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
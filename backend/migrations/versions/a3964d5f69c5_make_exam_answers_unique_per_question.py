@@ -0,0 +1,41 @@
+"""make exam answers unique per question
+
+Revision ID: a3964d5f69c5
+Revises: ff7c1a4c9ec5
+Create Date: 2026-10-18 19:00:24.622114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3964d5f69c5'
+down_revision: Union[str, None] = 'ff7c1a4c9ec5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    unique_columns = [index['column_names'] for index in inspector.get_indexes('exam_answers') if index['unique']]
+    unique_columns += [constraint['column_names'] for constraint in inspector.get_unique_constraints('exam_answers')]
+    if ['exam_id', 'question_id'] in unique_columns:
+        return
+
+    # Submits used to insert one row per submitted entry, so a question answered twice has two rows;
+    # keep the last one. The derived table lets MySQL delete from the table it selects from.
+    op.execute(
+        "DELETE FROM exam_answers WHERE exam_id IS NOT NULL AND question_id IS NOT NULL AND id NOT IN ("
+        "SELECT id FROM (SELECT MAX(id) AS id FROM exam_answers "
+        "WHERE exam_id IS NOT NULL AND question_id IS NOT NULL GROUP BY exam_id, question_id) AS latest)"
+    )
+    with op.batch_alter_table('exam_answers') as batch_op:
+        batch_op.create_unique_constraint('uq_exam_answers_exam_id_question_id', ['exam_id', 'question_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('exam_answers') as batch_op:
+        batch_op.drop_constraint('uq_exam_answers_exam_id_question_id', type_='unique')
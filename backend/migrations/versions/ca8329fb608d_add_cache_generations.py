@@ -0,0 +1,32 @@
+"""add cache_generations
+
+Revision ID: ca8329fb608d
+Revises: a3964d5f69c5
+Create Date: 2026-10-18 19:00:26.649691
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ca8329fb608d'
+down_revision: Union[str, None] = 'a3964d5f69c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('cache_generations'):
+        return
+    op.create_table('cache_generations',
+    sa.Column('domain', sa.String(), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('domain')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cache_generations')
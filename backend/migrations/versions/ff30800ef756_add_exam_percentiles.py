@@ -0,0 +1,33 @@
+"""add exam percentiles
+
+Revision ID: ff30800ef756
+Revises: ca8329fb608d
+Create Date: 2026-10-18 19:00:28.785849
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ff30800ef756'
+down_revision: Union[str, None] = 'ca8329fb608d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'percentile' not in {column['name'] for column in inspector.get_columns('exams')}:
+        # Exams completed before this show no percentile.
+        op.add_column('exams', sa.Column('percentile', sa.Float(), nullable=True))
+    if 'ix_exams_is_completed_score' not in {index['name'] for index in inspector.get_indexes('exams')}:
+        op.create_index('ix_exams_is_completed_score', 'exams', ['is_completed', 'score'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_exams_is_completed_score', table_name='exams')
+    with op.batch_alter_table('exams') as batch_op:
+        batch_op.drop_column('percentile')
@@ -0,0 +1,68 @@
+"""add questions.content_hash
+
+Revision ID: ff7c1a4c9ec5
+Revises: 23c7c501f233
+Create Date: 2026-10-18 19:00:22.587030
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ff7c1a4c9ec5'
+down_revision: Union[str, None] = '23c7c501f233'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+questions = sa.table('questions',
+    sa.column('id', sa.Integer()),
+    sa.column('question_text', sa.Text()),
+    sa.column('option_a', sa.String()),
+    sa.column('option_b', sa.String()),
+    sa.column('option_c', sa.String()),
+    sa.column('option_d', sa.String()),
+    sa.column('content_hash', sa.String(64)),
+)
+
+
+def content_hash(row) -> str:
+    # Same as import_questions.content_hash, copied so this revision keeps hashing the way it did when written.
+    fields = (row.question_text, row.option_a, row.option_b, row.option_c, row.option_d)
+    return hashlib.sha256("\x1f".join(field.strip() for field in fields).encode()).hexdigest()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'content_hash' not in {column['name'] for column in inspector.get_columns('questions')}:
+        op.add_column('questions', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    # Hash existing questions so re-importing them is recognised as a duplicate. Only the lowest id
+    # of each duplicate group is hashed; the rest keep NULL, which the unique index allows.
+    seen = set(bind.execute(sa.select(questions.c.content_hash).where(questions.c.content_hash.is_not(None))).scalars())
+    updates = []
+    for row in bind.execute(sa.select(questions).where(questions.c.content_hash.is_(None)).order_by(questions.c.id)):
+        digest = content_hash(row)
+        if digest not in seen:
+            seen.add(digest)
+            updates.append({'question_id': row.id, 'digest': digest})
+    if updates:
+        bind.execute(
+            questions.update().where(questions.c.id == sa.bindparam('question_id'))
+            .values(content_hash=sa.bindparam('digest')),
+            updates,
+        )
+
+    if 'ix_questions_content_hash' not in {index['name'] for index in inspector.get_indexes('questions')}:
+        op.create_index('ix_questions_content_hash', 'questions', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_content_hash', table_name='questions')
+    with op.batch_alter_table('questions') as batch_op:
+        batch_op.drop_column('content_hash')
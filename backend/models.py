@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, Index, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -24,10 +24,16 @@ class Question(Base):
     option_c = Column(String, nullable=False)
     option_d = Column(String, nullable=False)
     correct_answer = Column(String, nullable=False)
+    content_hash = Column(String(64), unique=True, index=True, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class Exam(Base):
     __tablename__ = "exams"
+    __table_args__ = (
+        Index("ix_exams_user_id_is_completed_end_time", "user_id", "is_completed", "end_time"),
+        Index("ix_exams_is_completed_end_time", "is_completed", "end_time"),
+        Index("ix_exams_is_completed_score", "is_completed", "score"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -35,19 +41,67 @@ class Exam(Base):
     end_time = Column(DateTime(timezone=True), nullable=True)
     is_completed = Column(Boolean, default=False)
     score = Column(Float, nullable=True)
+    percentile = Column(Float, nullable=True)
     total_questions = Column(Integer, default=0)
     correct_answers = Column(Integer, default=0)
+    question_ids = Column(JSON, nullable=True)
     
     user = relationship("User", back_populates="exams")
     answers = relationship("ExamAnswer", back_populates="exam")
 
 class ExamAnswer(Base):
     __tablename__ = "exam_answers"
+    __table_args__ = (
+        UniqueConstraint("exam_id", "question_id", name="uq_exam_answers_exam_id_question_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    exam_id = Column(Integer, ForeignKey("exams.id"))
+    exam_id = Column(Integer, ForeignKey("exams.id"), index=True)
     question_id = Column(Integer, ForeignKey("questions.id"))
     selected_answer = Column(String, nullable=False)
     is_correct = Column(Boolean, nullable=True)
     
     exam = relationship("Exam", back_populates="answers")
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    best_score = Column(Float, nullable=True)
+    score_sum = Column(Float, nullable=False, default=0)
+    last_score = Column(Float, nullable=True)
+    correct_answers_sum = Column(Integer, nullable=False, default=0)
+    total_questions_sum = Column(Integer, nullable=False, default=0)
+    last_exam_id = Column(Integer, ForeignKey("exams.id"), nullable=True)
+    last_completed_at = Column(DateTime(timezone=True), nullable=True)
+
+class ItemStats(Base):
+    __tablename__ = "item_stats"
+    
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    responses = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    option_a_count = Column(Integer, nullable=False, default=0)
+    option_b_count = Column(Integer, nullable=False, default=0)
+    option_c_count = Column(Integer, nullable=False, default=0)
+    option_d_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)
+    score_square_sum = Column(Float, nullable=False, default=0)
+    correct_score_sum = Column(Float, nullable=False, default=0)
+    difficulty = Column(Float, nullable=True)
+    discrimination = Column(Float, nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+class AnalysisWatermark(Base):
+    __tablename__ = "analysis_watermarks"
+    
+    name = Column(String, primary_key=True)
+    last_end_time = Column(DateTime(timezone=True), nullable=True)
+    last_exam_id = Column(Integer, nullable=True)
+
+class CacheGeneration(Base):
+    __tablename__ = "cache_generations"
+    
+    domain = Column(String, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,127 @@
+import asyncio
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from config import settings
+from metrics import registry, Counter, route_label
+
+PROFILE_HEADER = b"x-profile"
+
+profiled_requests = registry.register(Counter(
+    "exam_app_profiled_requests_total", "Requests profiled and written to the profile ring", ("trigger",)))
+
+class RequestProfile:
+    __slots__ = ("profilers",)
+
+    def __init__(self):
+        self.profilers: List[cProfile.Profile] = []
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+# cProfile hooks one profiler per thread, so only one request is profiled at a time.
+_profiling = threading.Lock()
+
+def _profiled_endpoint(endpoint):
+    # Sync endpoints run in a worker thread the event-loop profiler can't see; profile them there.
+    @wraps(endpoint)
+    def run(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        profiler = cProfile.Profile()
+        profile.profilers.append(profiler)
+        profiler.enable()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profiler.disable()
+    return run
+
+class ProfiledRoute(APIRoute):
+    def __init__(self, path, endpoint, **kwargs):
+        if settings.profiling_enabled and not asyncio.iscoroutinefunction(endpoint):
+            endpoint = _profiled_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+def _requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            if settings.profiling_token:
+                return hmac.compare_digest(value, settings.profiling_token.encode())
+            return settings.debug
+    return False
+
+class ProfileRing:
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+
+    def write(self, profilers: List[cProfile.Profile], method: str, route: str, latency_ms: float) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S.%f")
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        name = f"{stamp}-{method}-{slug}-{latency_ms:.0f}ms.prof"
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(os.path.join(self.directory, name))
+
+        files = sorted(f for f in os.listdir(self.directory) if f.endswith(".prof"))
+        for old in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except FileNotFoundError:
+                pass
+        return name
+
+profile_ring = ProfileRing(settings.profiling_dir, settings.profiling_max_files)
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = None
+        if _requested(scope):
+            trigger = "header"
+        elif settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate:
+            trigger = "sample"
+        if trigger is None or not _profiling.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self._profile(scope, receive, send, trigger)
+        finally:
+            _profiling.release()
+
+    async def _profile(self, scope, receive, send, trigger):
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        loop_profiler = cProfile.Profile()
+        profile.profilers.append(loop_profiler)
+        # The event-loop side also records whatever else the loop ran meanwhile.
+        started = time.perf_counter()
+        loop_profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            loop_profiler.disable()
+            latency_ms = (time.perf_counter() - started) * 1000
+            _current_profile.reset(token)
+        await run_in_threadpool(profile_ring.write, profile.profilers, scope["method"], route_label(scope), latency_ms)
+        profiled_requests.inc((trigger,))
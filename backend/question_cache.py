@@ -0,0 +1,137 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import Question
+from schemas import Question as QuestionSchema
+from cache_generations import QUESTIONS, mark_changed, on_generation_changed
+
+_change_listeners: List[Callable[[Set[int], Set[int], Set[int]], None]] = []
+
+def on_questions_changed(listener):
+    _change_listeners.append(listener)
+    return listener
+
+def notify_questions_changed(added=(), updated=(), deleted=()):
+    added, updated, deleted = set(added), set(updated), set(deleted)
+    for listener in _change_listeners:
+        listener(added, updated, deleted)
+
+def _pending_changes(session):
+    return session.info.setdefault("question_changes", (set(), set(), set()))
+
+@event.listens_for(Session, "after_flush")
+def _track_question_changes(session, flush_context):
+    added, updated, deleted = _pending_changes(session)
+    for obj in session.new:
+        if isinstance(obj, Question):
+            added.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Question) and session.is_modified(obj):
+            updated.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Question):
+            deleted.add(obj.id)
+    if added or updated or deleted:
+        mark_changed(session, QUESTIONS)
+
+@event.listens_for(Session, "after_commit")
+def _publish_question_changes(session):
+    changes = session.info.pop("question_changes", None)
+    if changes and any(changes):
+        notify_questions_changed(*changes)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_question_changes(session):
+    session.info.pop("question_changes", None)
+
+class AnswerKeyCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._keys: Dict[int, str] = {}
+
+    @property
+    def version(self):
+        return self._version
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._keys = {}
+
+    def get_many(self, db: Session, question_ids: Iterable[int]) -> Dict[int, str]:
+        keys = self._keys
+        version = self._version
+        found = {}
+        missing = set()
+        for question_id in question_ids:
+            answer = keys.get(question_id)
+            if answer is None:
+                missing.add(question_id)
+            else:
+                found[question_id] = answer
+
+        if missing:
+            rows = db.query(Question.id, Question.correct_answer).filter(Question.id.in_(missing)).all()
+            loaded = {row.id: row.correct_answer for row in rows}
+            found.update(loaded)
+            with self._lock:
+                if self._version == version:
+                    self._keys.update(loaded)
+
+        return found
+
+answer_keys = AnswerKeyCache()
+
+@on_questions_changed
+def _invalidate_answer_keys(added, updated, deleted):
+    if updated or deleted:
+        answer_keys.invalidate()
+
+on_generation_changed(QUESTIONS)(answer_keys.invalidate)
+
+class QuestionFragmentCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._fragments: Dict[int, bytes] = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._fragments = {}
+
+    def get_many(self, db: Session, question_ids: Iterable[int]) -> Dict[int, bytes]:
+        fragments = self._fragments
+        version = self._version
+        found = {}
+        missing = set()
+        for question_id in question_ids:
+            fragment = fragments.get(question_id)
+            if fragment is None:
+                missing.add(question_id)
+            else:
+                found[question_id] = fragment
+
+        if missing:
+            rows = db.query(Question).filter(Question.id.in_(missing)).all()
+            loaded = {row.id: QuestionSchema.model_validate(row).model_dump_json().encode() for row in rows}
+            found.update(loaded)
+            with self._lock:
+                if self._version == version:
+                    self._fragments.update(loaded)
+
+        return found
+
+question_fragments = QuestionFragmentCache()
+
+def json_array(fragments: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(fragments) + b"]"
+
+@on_questions_changed
+def _invalidate_question_fragments(added, updated, deleted):
+    if updated or deleted:
+        question_fragments.invalidate()
+
+on_generation_changed(QUESTIONS)(question_fragments.invalidate)
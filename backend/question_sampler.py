@@ -0,0 +1,101 @@
+import random
+import threading
+from array import array
+from typing import Dict, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import Question
+from question_cache import on_questions_changed
+from cache_generations import QUESTIONS, on_generation_changed
+
+def _fetch_questions(db: Session, question_ids) -> Dict[int, Question]:
+    return {q.id: q for q in db.query(Question).filter(Question.id.in_(question_ids)).all()}
+
+class QuestionSampler:
+    def __init__(self, rng=None):
+        self._lock = threading.Lock()
+        self._rng = rng or random.Random()
+        self._ids = array("q")
+        self._positions: Dict[int, int] = {}
+        self._loaded = False
+
+    @property
+    def size(self):
+        return len(self._ids)
+
+    def load(self, db: Session):
+        result = db.connection().execute(select(Question.id).execution_options(yield_per=10000))
+        ids = array("q", result.scalars())
+        with self._lock:
+            self._ids = ids
+            self._positions = {question_id: i for i, question_id in enumerate(ids)}
+            self._loaded = True
+
+    def invalidate(self):
+        with self._lock:
+            self._ids = array("q")
+            self._positions = {}
+            self._loaded = False
+
+    def add(self, question_ids):
+        with self._lock:
+            if not self._loaded:
+                return
+            for question_id in question_ids:
+                if question_id not in self._positions:
+                    self._positions[question_id] = len(self._ids)
+                    self._ids.append(question_id)
+
+    def remove(self, question_ids):
+        with self._lock:
+            if not self._loaded:
+                return
+            for question_id in question_ids:
+                position = self._positions.pop(question_id, None)
+                if position is None:
+                    continue
+                last = self._ids.pop()
+                if last != question_id:
+                    self._ids[position] = last
+                    self._positions[last] = position
+
+    def draw_ids(self, k: int) -> List[int]:
+        with self._lock:
+            ids = self._ids
+            k = min(k, len(ids))
+            return [ids[i] for i in self._rng.sample(range(len(ids)), k)]
+
+    def sample(self, db: Session, k: int) -> List[Question]:
+        return [question for _, question in self.sample_with(db, k, _fetch_questions)]
+
+    def sample_with(self, db: Session, k: int, fetch) -> List[Tuple[int, object]]:
+        if not self._loaded:
+            self.load(db)
+
+        chosen = []
+        chosen_ids = set()
+        for _ in range(3):
+            needed = k - len(chosen)
+            wanted = [i for i in self.draw_ids(needed + len(chosen_ids)) if i not in chosen_ids][:needed]
+            if not wanted:
+                break
+            rows = fetch(db, wanted)
+            stale = [i for i in wanted if i not in rows]
+            if stale:
+                self.remove(stale)
+            for question_id in wanted:
+                if question_id in rows:
+                    chosen.append((question_id, rows[question_id]))
+                    chosen_ids.add(question_id)
+            if not stale:
+                break
+        return chosen
+
+question_sampler = QuestionSampler()
+
+@on_questions_changed
+def _refresh_sampler(added, updated, deleted):
+    question_sampler.remove(deleted)
+    question_sampler.add(added)
+
+on_generation_changed(QUESTIONS)(question_sampler.invalidate)
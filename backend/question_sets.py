@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+from config import settings
+from database import SessionLocal
+from metrics import registry, Counter, Gauge, Histogram, LATENCY_BUCKETS
+from question_cache import on_questions_changed, question_fragments, json_array
+from question_sampler import question_sampler
+from cache_generations import QUESTIONS, on_generation_changed
+
+EXAM_QUESTIONS = 10
+REFILL_RETRY_SECONDS = 1.0
+
+question_set_claims = registry.register(Counter(
+    "exam_app_question_set_claims_total", "Exam starts served from the pre-generated pool (hit) or sampled inline (miss)",
+    ("result",)))
+question_set_refill_lag = registry.register(Histogram(
+    "exam_app_question_set_refill_lag_seconds", "Time from the pool dropping below its low-water mark to being full again",
+    LATENCY_BUCKETS))
+question_set_refill_errors = registry.register(Counter(
+    "exam_app_question_set_refill_errors_total", "Refill passes that failed and were retried"))
+
+class QuestionSetPool:
+    def __init__(self, questions_per_exam: int, size: int, low_water: int):
+        self.questions_per_exam = questions_per_exam
+        self.size = size
+        self.low_water = min(low_water, size)
+        self._lock = threading.Lock()
+        self._version = 0
+        self._sets: deque = deque()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._below_since: Optional[float] = None
+        self._hits = 0
+        self._misses = 0
+        self._last_lag = None
+
+    def __len__(self):
+        return len(self._sets)
+
+    def start(self):
+        if self.size <= 0 or self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="question-set-refill", daemon=True)
+        self._thread.start()
+        self._request_refill()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        thread.join(timeout=5)
+
+    def claim(self) -> Optional[Tuple[List[int], bytes]]:
+        with self._lock:
+            entry = self._sets.popleft() if self._sets else None
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        question_set_claims.inc(("miss",) if entry is None else ("hit",))
+        if len(self._sets) < self.low_water:
+            self._request_refill()
+        return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._sets.clear()
+        self._request_refill()
+
+    def metrics(self):
+        with self._lock:
+            claims = self._hits + self._misses
+            return {
+                "size": len(self._sets),
+                "target": self.size,
+                "low_water": self.low_water,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / claims, 4) if claims else None,
+                "last_refill_lag_ms": None if self._last_lag is None else round(self._last_lag * 1000, 2),
+            }
+
+    def _request_refill(self):
+        if self._thread is None:
+            return
+        with self._lock:
+            if self._below_since is None:
+                self._below_since = time.perf_counter()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self._refill()
+            except Exception:
+                question_set_refill_errors.inc()
+                if self._stopping.wait(REFILL_RETRY_SECONDS):
+                    break
+                self._wake.set()
+
+    def _refill(self):
+        db = SessionLocal()
+        try:
+            while not self._stopping.is_set() and len(self._sets) < self.size:
+                version = self._version
+                questions = question_sampler.sample_with(db, self.questions_per_exam, question_fragments.get_many)
+                db.rollback()
+                if len(questions) < self.questions_per_exam:
+                    # Not enough questions yet; the next bank change wakes us up again.
+                    return
+                entry = ([question_id for question_id, _ in questions], json_array(fragment for _, fragment in questions))
+                with self._lock:
+                    if version == self._version:
+                        self._sets.append(entry)
+        finally:
+            db.close()
+
+        with self._lock:
+            if self._below_since is not None and len(self._sets) >= self.size:
+                self._last_lag = time.perf_counter() - self._below_since
+                self._below_since = None
+                question_set_refill_lag.observe(self._last_lag)
+
+question_sets = QuestionSetPool(EXAM_QUESTIONS, settings.question_set_pool_size, settings.question_set_low_water)
+
+registry.register(Gauge(
+    "exam_app_question_set_pool_size", "Pre-generated question sets ready to be claimed", lambda: len(question_sets)))
+registry.register(Gauge(
+    "exam_app_question_set_pool_target", "Question sets the pool refills up to", lambda: question_sets.size))
+
+@on_questions_changed
+def _invalidate_question_sets(added, updated, deleted):
+    question_sets.invalidate()
+
+on_generation_changed(QUESTIONS)(question_sets.invalidate)
@@ -1,26 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from database import get_db
+from database import get_db, get_async_db, releases_connection
 from models import User
 from schemas import UserCreate, User as UserSchema, Token
-from auth import verify_password, get_password_hash, create_access_token
+from auth import create_access_token
+from hashing import hash_executor
 from config import settings
+from profiling import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
+async_router = APIRouter(route_class=ProfiledRoute)
 
-@router.post("/register", response_model=UserSchema)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+@releases_connection
+def _ensure_available(db: Session, user: UserCreate):
     db_user = db.query(User).filter(User.email == user.email).first()
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    
+
     db_user = db.query(User).filter(User.username == user.username).first()
     if db_user:
         raise HTTPException(status_code=400, detail="Username already taken")
-    
-    hashed_password = get_password_hash(user.password)
+
+@releases_connection
+def _create_user(db: Session, user: UserCreate, hashed_password: str):
     db_user = User(
         email=user.email,
         username=user.username,
@@ -29,20 +36,67 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    return db_user
+    return UserSchema.model_validate(db_user)
 
-@router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+@releases_connection
+def _get_user(db: Session, username: str):
+    return db.execute(
+        select(User.id, User.username, User.hashed_password).where(User.username == username)
+    ).first()
+
+@releases_connection
+def _update_password_hash(db: Session, user_id: int, hashed_password: str):
+    user = db.get(User, user_id)
+    if user is not None:
+        user.hashed_password = hashed_password
+        db.commit()
+
+def _issue_token(username: str):
+    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    access_token = create_access_token(
+        data={"sub": username}, expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
+
+async def _check_password(user, password: str):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await hash_executor.verify_and_update(password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return new_hash
+
+@router.post("/register", response_model=UserSchema)
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    await run_in_threadpool(_ensure_available, db, user)
+    hashed_password = await hash_executor.hash(user.password)
+    return await run_in_threadpool(_create_user, db, user, hashed_password)
+
+@router.post("/login", response_model=Token)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_get_user, db, form_data.username)
+    new_hash = await _check_password(user, form_data.password)
+
+    username = user.username
+    if new_hash:
+        await run_in_threadpool(_update_password_hash, db, user.id, new_hash)
+
+    return _issue_token(username)
+
+@async_router.post("/register", response_model=UserSchema)
+async def register_async(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    await db.run_sync(_ensure_available, user)
+    hashed_password = await hash_executor.hash(user.password)
+    return await db.run_sync(_create_user, user, hashed_password)
+
+@async_router.post("/login", response_model=Token)
+async def login_async(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await db.run_sync(_get_user, form_data.username)
+    new_hash = await _check_password(user, form_data.password)
+    if new_hash:
+        await db.run_sync(_update_password_hash, user.id, new_hash)
+    return _issue_token(user.username)
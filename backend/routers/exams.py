@@ -1,106 +1,214 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, insert, select, tuple_, update
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+import base64
 import random
-from typing import List
-from database import get_db
-from models import User, Question, Exam, ExamAnswer
-from schemas import Question as QuestionSchema, ExamSubmission, ExamResult
-from auth import get_current_user
+from typing import List, Optional
+from config import settings
+from profiling import ProfiledRoute
+from database import get_db, get_async_db, releases_connection, SessionLocal, AsyncSessionLocal
+from models import Exam, ExamAnswer, User, UserStats
+from schemas import (
+    Question as QuestionSchema, ExamSubmission, ExamResult, User as UserSchema,
+    Exam as ExamSchema, ExamHistoryPage, UserStats as UserStatsSchema,
+    AnswerCreate, AutosaveResult, SavedAnswers, Leaderboard, LeaderboardEntry,
+)
+from auth import get_current_user, get_current_user_async
+from question_cache import answer_keys, question_fragments, json_array
+from question_sampler import question_sampler
+from question_sets import question_sets, EXAM_QUESTIONS
+from answer_buffer import answer_buffer
+from user_stats import get_user_stats, record_exam
+from score_distribution import score_distribution
+from http_cache import (
+    results_cache, etag_for, etag_matches, cached_json_response,
+    RESULTS_CACHE_CONTROL, HISTORY_CACHE_CONTROL,
+)
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
+async_router = APIRouter(route_class=ProfiledRoute)
 
-@router.get("/start", response_model=List[QuestionSchema])
-def start_exam(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+HISTORY_COLUMNS = (
+    Exam.id, Exam.user_id, Exam.start_time, Exam.end_time, Exam.is_completed,
+    Exam.score, Exam.total_questions, Exam.correct_answers,
+)
+HISTORY_STREAM_BATCH = 500
+
+@releases_connection
+def _start_exam(db: Session, user_id: int) -> bytes:
     active_exam = db.query(Exam).filter(
-        Exam.user_id == current_user.id,
+        Exam.user_id == user_id,
         Exam.is_completed == False
         
     ).first()
     
-    if active_exam:
-        raise HTTPException(status_code=400, detail="You already have an active exam")
-    
-    questions = db.query(Question).order_by(func.random()).limit(10).all()
+    if active_exam and active_exam.question_ids:
+        fragments = question_fragments.get_many(db, active_exam.question_ids)
+        return json_array(fragments[i] for i in active_exam.question_ids if i in fragments)
     
-    if len(questions) < 10:
-        raise HTTPException(status_code=500, detail="Not enough questions in database")
+    claimed = question_sets.claim()
+    if claimed:
+        question_ids, body = claimed
+    else:
+        questions = question_sampler.sample_with(db, EXAM_QUESTIONS, question_fragments.get_many)
+        
+        if len(questions) < EXAM_QUESTIONS:
+            raise HTTPException(status_code=500, detail="Not enough questions in database")
+        
+        question_ids = [question_id for question_id, _ in questions]
+        body = json_array(fragment for _, fragment in questions)
     
-    exam = Exam(
-        user_id=current_user.id,
-        total_questions=len(questions)
-    )
-    db.add(exam)
+    if active_exam:
+        # Exams started before served questions were recorded get their set now.
+        active_exam.question_ids = question_ids
+        active_exam.total_questions = len(question_ids)
+    else:
+        db.add(Exam(
+            user_id=user_id,
+            total_questions=len(question_ids),
+            question_ids=question_ids
+        ))
     db.commit()
-    db.refresh(exam)
     
-    return questions
+    return body
 
-@router.post("/submit")
-def submit_exam(
-    submission: ExamSubmission,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    exam = db.query(Exam).filter(
-        Exam.user_id == current_user.id,
+def _active_exam_query(db: Session, user_id: int):
+    return db.query(Exam.id, Exam.question_ids).filter(
+        Exam.user_id == user_id,
         Exam.is_completed == False
-    ).first()
+    )
+
+def _saved_answers(db: Session, exam_id: int):
+    # Peek first: a flush committing between the two reads would leave its answers in neither.
+    buffered = answer_buffer.peek(exam_id)
+    saved = dict(db.execute(
+        select(ExamAnswer.question_id, ExamAnswer.selected_answer).where(ExamAnswer.exam_id == exam_id)
+    ).all())
+    return {**saved, **buffered}
+
+@releases_connection
+def _submit_exam(db: Session, user_id: int, submission: ExamSubmission):
+    active_exam = _active_exam_query(db, user_id).with_for_update().first()
     
-    if not exam:
+    if active_exam is None:
         raise HTTPException(status_code=400, detail="No active exam found")
     
-    questions = db.query(Question).all()
-    question_dict = {q.id: q for q in questions}
+    exam_id, served_ids = active_exam
+    if served_ids:
+        served = set(served_ids)
+        autosaved = _saved_answers(db, exam_id)
+        submitted = {}
+        for answer_data in submission.answers:
+            if answer_data.question_id in served:
+                submitted.setdefault(answer_data.question_id, answer_data.selected_answer)
+        # Answers in the submission win over autosaved ones for the same question.
+        selected = {q: a for q, a in autosaved.items() if q in served}
+        selected.update(submitted)
+        total_questions = len(served_ids)
+    else:
+        selected = {a.question_id: a.selected_answer for a in submission.answers}
+        total_questions = len(submission.answers)
+    
+    correct_keys = answer_keys.get_many(db, selected)
     
     correct_answers = 0
-    total_questions = len(submission.answers)
+    answer_rows = []
     
-    for answer_data in submission.answers:
-        question = question_dict.get(answer_data.question_id)
-        if not question:
+    for question_id, selected_answer in selected.items():
+        correct_answer = correct_keys.get(question_id)
+        if correct_answer is None:
             continue
             
-        is_correct = answer_data.selected_answer == question.correct_answer
+        is_correct = selected_answer == correct_answer
         if is_correct:
             correct_answers += 1
         
-        exam_answer = ExamAnswer(
-            exam_id=exam.id,
-            question_id=answer_data.question_id,
-            selected_answer=answer_data.selected_answer,
-            is_correct=is_correct
-        )
-        db.add(exam_answer)
+        answer_rows.append({
+            "exam_id": exam_id,
+            "question_id": question_id,
+            "selected_answer": selected_answer,
+            "is_correct": is_correct
+        })
     
     score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
+    # Fixed at submission, so cached results stay valid as later candidates finish.
+    percentile = score_distribution.percentile(score, counted=False)
     
-    exam.is_completed = True
-    exam.end_time = datetime.utcnow()
-    exam.score = score
-    exam.correct_answers = correct_answers
-    
+    completed_at = datetime.utcnow()
+    # Always clear ungraded rows: an autosave flush may have committed some since they were read
+    # (SQLite takes no lock until this first write). Its answers are already in `autosaved`.
+    db.execute(delete(ExamAnswer).where(ExamAnswer.exam_id == exam_id))
+    if answer_rows:
+        db.execute(insert(ExamAnswer), answer_rows)
+    db.execute(
+        update(Exam)
+        .where(Exam.id == exam_id)
+        .values(
+            is_completed=True,
+            end_time=completed_at,
+            score=score,
+            percentile=percentile,
+            correct_answers=correct_answers
+        )
+        .execution_options(synchronize_session=False)
+    )
+    record_exam(db, user_id, exam_id, score, correct_answers, total_questions, completed_at)
     db.commit()
-    db.refresh(exam)
+    answer_buffer.discard(exam_id)
+    score_distribution.add(score)
     
     return {
-        "exam_id": exam.id,
+        "exam_id": exam_id,
         "score": score,
         "total_questions": total_questions,
         "correct_answers": correct_answers,
-        "percentage": round(score, 2)
+        "percentage": round(score, 2),
+        "percentile": percentile
     }
 
-@router.get("/results/{exam_id}", response_model=ExamResult)
-def get_exam_results(
-    exam_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+@releases_connection
+def _autosave_answers(db: Session, user_id: int, submission: ExamSubmission):
+    active_exam = _active_exam_query(db, user_id).first()
+    # End the read before a write-through save starts its own write transaction.
+    db.rollback()
+    
+    if active_exam is None:
+        raise HTTPException(status_code=400, detail="No active exam found")
+    
+    exam_id, served_ids = active_exam
+    served = set(served_ids or ())
+    answers = {}
+    for answer_data in submission.answers:
+        if answer_data.question_id in served:
+            answers[answer_data.question_id] = answer_data.selected_answer
+    
+    if answers:
+        answer_buffer.save(db, exam_id, answers)
+    return AutosaveResult(exam_id=exam_id, saved=len(answers))
+
+@releases_connection
+def _get_saved_answers(db: Session, user_id: int):
+    active_exam = _active_exam_query(db, user_id).first()
+    
+    if active_exam is None:
+        raise HTTPException(status_code=400, detail="No active exam found")
+    
+    exam_id, served_ids = active_exam
+    saved = _saved_answers(db, exam_id)
+    return SavedAnswers(
+        exam_id=exam_id,
+        answers=[AnswerCreate(question_id=q, selected_answer=saved[q]) for q in served_ids or () if q in saved]
+    )
+
+@releases_connection
+def _get_exam_results(db: Session, user_id: int, exam_id: int):
     exam = db.query(Exam).filter(
         Exam.id == exam_id,
-        Exam.user_id == current_user.id
+        Exam.user_id == user_id
     ).first()
     
     if not exam:
@@ -109,21 +217,240 @@ def get_exam_results(
     if not exam.is_completed:
         raise HTTPException(status_code=400, detail="Exam not completed yet")
     
-    return ExamResult(
+    result = ExamResult(
         exam_id=exam.id,
         score=exam.score,
         total_questions=exam.total_questions,
         correct_answers=exam.correct_answers,
         percentage=round(exam.score, 2) if exam.score else 0,
+        percentile=exam.percentile,
         start_time=exam.start_time,
         end_time=exam.end_time
     )
+    return result
 
-@router.get("/history")
-def get_exam_history(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    exams = db.query(Exam).filter(
-        Exam.user_id == current_user.id,
+def _encode_history_cursor(end_time: datetime, exam_id: int) -> str:
+    raw = f"{end_time.isoformat()}|{exam_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_history_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        end_time, exam_id = raw.split("|")
+        return datetime.fromisoformat(end_time), int(exam_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
+
+def _history_query(user_id: int, position):
+    query = select(*HISTORY_COLUMNS).where(
+        Exam.user_id == user_id,
         Exam.is_completed == True
-    ).order_by(Exam.end_time.desc()).all()
+    )
+    if position:
+        query = query.where(tuple_(Exam.end_time, Exam.id) < tuple_(*position))
+    return query.order_by(Exam.end_time.desc(), Exam.id.desc())
+
+@releases_connection
+def _get_exam_history(db: Session, user_id: int, limit: int, position=None):
+    rows = db.execute(_history_query(user_id, position).limit(limit + 1)).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_history_cursor(rows[-1].end_time, rows[-1].id)
+    
+    return ExamHistoryPage(
+        items=[ExamSchema(**row._mapping) for row in rows],
+        next_cursor=next_cursor
+    )
+
+@releases_connection
+def _cache_exam_result(db: Session, user_id: int, exam_id: int):
+    result = _get_exam_results(db, user_id, exam_id)
+    return results_cache.put(exam_id, user_id, result.model_dump_json().encode())
+
+def _history_etag(db: Session, user_id: int, limit: int, cursor: Optional[str]):
+    latest = db.execute(
+        select(UserStats.attempts, UserStats.last_exam_id).where(UserStats.user_id == user_id)
+    ).first()
+    return etag_for(f"{user_id}:{tuple(latest or ())}:{limit}:{cursor}".encode())
+
+@releases_connection
+def _exam_history_response(db: Session, request: Request, user_id: int, limit: int, cursor: Optional[str], position):
+    etag = _history_etag(db, user_id, limit, cursor)
+    if etag_matches(request, etag):
+        return cached_json_response(request, b"", etag, HISTORY_CACHE_CONTROL)
+    page = _get_exam_history(db, user_id, limit, position)
+    return cached_json_response(request, page.model_dump_json().encode(), etag, HISTORY_CACHE_CONTROL)
+
+@releases_connection
+def _get_exam_stats(db: Session, user_id: int):
+    return get_user_stats(db, user_id)
+
+@releases_connection
+def _get_leaderboard(db: Session, limit: int):
+    rows = db.execute(
+        select(Exam.id, User.username, Exam.score, Exam.end_time)
+        .join(User, User.id == Exam.user_id)
+        .where(Exam.is_completed == True, Exam.score.is_not(None))
+        .order_by(Exam.score.desc(), Exam.end_time, Exam.id)
+        .limit(limit)
+    ).all()
     
-    return exams
+    # The rows are the exact top N in score order, so ties can be ranked from them alone.
+    entries = []
+    for position, row in enumerate(rows, start=1):
+        tied = entries and row.score == rows[position - 2].score
+        entries.append(LeaderboardEntry(
+            rank=entries[-1].rank if tied else position,
+            exam_id=row.id,
+            username=row.username,
+            score=round(row.score, 2),
+            completed_at=row.end_time
+        ))
+    
+    return Leaderboard(
+        total_exams=len(score_distribution) if score_distribution.loaded else None,
+        entries=entries
+    )
+
+def _stream_exam_history(user_id: int, position):
+    db = SessionLocal()
+    try:
+        rows = db.execute(_history_query(user_id, position).execution_options(yield_per=HISTORY_STREAM_BATCH))
+        for row in rows:
+            yield ExamSchema(**row._mapping).model_dump_json() + "\n"
+    finally:
+        db.close()
+
+async def _stream_exam_history_async(user_id: int, position):
+    async with AsyncSessionLocal() as db:
+        rows = await db.stream(_history_query(user_id, position).execution_options(yield_per=HISTORY_STREAM_BATCH))
+        async for row in rows:
+            yield ExamSchema(**row._mapping).model_dump_json() + "\n"
+
+@router.get("/start", response_model=List[QuestionSchema])
+def start_exam(current_user: UserSchema = Depends(get_current_user), db: Session = Depends(get_db)):
+    return Response(_start_exam(db, current_user.id), media_type="application/json")
+
+@router.post("/submit")
+def submit_exam(
+    submission: ExamSubmission,
+    current_user: UserSchema = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return _submit_exam(db, current_user.id, submission)
+
+@router.put("/answers", response_model=AutosaveResult)
+def autosave_answers(
+    submission: ExamSubmission,
+    current_user: UserSchema = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return _autosave_answers(db, current_user.id, submission)
+
+@router.get("/answers", response_model=SavedAnswers)
+def get_saved_answers(current_user: UserSchema = Depends(get_current_user), db: Session = Depends(get_db)):
+    return _get_saved_answers(db, current_user.id)
+
+@router.get("/results/{exam_id}", response_model=ExamResult)
+async def get_exam_results(
+    exam_id: int,
+    request: Request,
+    current_user: UserSchema = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    cached = results_cache.get(exam_id, current_user.id)
+    if cached is None:
+        cached = await run_in_threadpool(_cache_exam_result, db, current_user.id, exam_id)
+    return cached_json_response(request, cached.body, cached.etag, RESULTS_CACHE_CONTROL)
+
+@router.get("/history", response_model=ExamHistoryPage)
+def get_exam_history(
+    request: Request,
+    limit: int = Query(settings.history_page_size, ge=1, le=settings.history_max_page_size),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    current_user: UserSchema = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    position = _decode_history_cursor(cursor)
+    if stream:
+        return StreamingResponse(_stream_exam_history(current_user.id, position), media_type="application/x-ndjson")
+    return _exam_history_response(db, request, current_user.id, limit, cursor, position)
+
+@router.get("/stats", response_model=UserStatsSchema)
+def get_exam_stats(current_user: UserSchema = Depends(get_current_user), db: Session = Depends(get_db)):
+    return _get_exam_stats(db, current_user.id)
+
+@router.get("/leaderboard", response_model=Leaderboard)
+def get_leaderboard(
+    limit: int = Query(settings.leaderboard_size, ge=1, le=settings.leaderboard_max_size),
+    current_user: UserSchema = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return _get_leaderboard(db, limit)
+
+@async_router.get("/start", response_model=List[QuestionSchema])
+async def start_exam_async(current_user: UserSchema = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)):
+    return Response(await db.run_sync(_start_exam, current_user.id), media_type="application/json")
+
+@async_router.post("/submit")
+async def submit_exam_async(
+    submission: ExamSubmission,
+    current_user: UserSchema = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(_submit_exam, current_user.id, submission)
+
+@async_router.put("/answers", response_model=AutosaveResult)
+async def autosave_answers_async(
+    submission: ExamSubmission,
+    current_user: UserSchema = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(_autosave_answers, current_user.id, submission)
+
+@async_router.get("/answers", response_model=SavedAnswers)
+async def get_saved_answers_async(current_user: UserSchema = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_get_saved_answers, current_user.id)
+
+@async_router.get("/results/{exam_id}", response_model=ExamResult)
+async def get_exam_results_async(
+    exam_id: int,
+    request: Request,
+    current_user: UserSchema = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    cached = results_cache.get(exam_id, current_user.id)
+    if cached is None:
+        cached = await db.run_sync(_cache_exam_result, current_user.id, exam_id)
+    return cached_json_response(request, cached.body, cached.etag, RESULTS_CACHE_CONTROL)
+
+@async_router.get("/history", response_model=ExamHistoryPage)
+async def get_exam_history_async(
+    request: Request,
+    limit: int = Query(settings.history_page_size, ge=1, le=settings.history_max_page_size),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    current_user: UserSchema = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    position = _decode_history_cursor(cursor)
+    if stream:
+        return StreamingResponse(_stream_exam_history_async(current_user.id, position), media_type="application/x-ndjson")
+    return await db.run_sync(_exam_history_response, request, current_user.id, limit, cursor, position)
+
+@async_router.get("/stats", response_model=UserStatsSchema)
+async def get_exam_stats_async(current_user: UserSchema = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_get_exam_stats, current_user.id)
+
+@async_router.get("/leaderboard", response_model=Leaderboard)
+async def get_leaderboard_async(
+    limit: int = Query(settings.leaderboard_size, ge=1, le=settings.leaderboard_max_size),
+    current_user: UserSchema = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(_get_leaderboard, limit)
@@ -59,6 +59,10 @@ class Exam(ExamBase):
     class Config:
         from_attributes = True
 
+class ExamHistoryPage(BaseModel):
+    items: List[Exam]
+    next_cursor: Optional[str] = None
+
 class AnswerBase(BaseModel):
     question_id: int
     selected_answer: str
@@ -77,11 +81,41 @@ class Answer(AnswerBase):
 class ExamSubmission(BaseModel):
     answers: List[AnswerCreate]
 
+class AutosaveResult(BaseModel):
+    exam_id: int
+    saved: int
+
+class SavedAnswers(BaseModel):
+    exam_id: int
+    answers: List[AnswerCreate]
+
 class ExamResult(BaseModel):
     exam_id: int
     score: float
     total_questions: int
     correct_answers: int
     percentage: float
+    percentile: Optional[float] = None
     start_time: datetime
     end_time: datetime
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    exam_id: int
+    username: str
+    score: float
+    completed_at: datetime
+
+class Leaderboard(BaseModel):
+    total_exams: Optional[int] = None
+    entries: List[LeaderboardEntry]
+
+class UserStats(BaseModel):
+    attempts: int = 0
+    best_score: Optional[float] = None
+    mean_score: Optional[float] = None
+    last_score: Optional[float] = None
+    correct_answers: int = 0
+    total_questions: int = 0
+    last_exam_id: Optional[int] = None
+    last_completed_at: Optional[datetime] = None
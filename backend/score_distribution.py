@@ -0,0 +1,130 @@
+import threading
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal
+from metrics import registry, Counter, Gauge
+from models import Exam
+
+# Scores are percentages; bucket them to hundredths so 0.00..100.00 maps onto 10001 slots.
+SCORE_SCALE = 100
+SCORE_BUCKETS = 100 * SCORE_SCALE + 1
+RETRY_SECONDS = 5.0
+
+score_distribution_rebuilds = registry.register(Counter(
+    "exam_app_score_distribution_rebuilds_total", "Score distribution rebuilds from the exams table"))
+score_distribution_errors = registry.register(Counter(
+    "exam_app_score_distribution_errors_total", "Score distribution rebuilds that failed"))
+
+def score_counts(db: Session):
+    return db.execute(
+        select(Exam.score, func.count()).where(Exam.is_completed == True, Exam.score.is_not(None))
+        .group_by(Exam.score)
+    ).all()
+
+def _bucket(score: float) -> int:
+    return min(max(int(round(score * SCORE_SCALE)), 0), SCORE_BUCKETS - 1)
+
+class ScoreDistribution:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._tree: List[int] = [0] * (SCORE_BUCKETS + 1)
+        self._total = 0
+        self._loaded = False
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self):
+        return self._total
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="score-distribution", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout=5)
+
+    def add(self, score: float):
+        with self._lock:
+            if not self._loaded:
+                return
+            position = _bucket(score) + 1
+            while position <= SCORE_BUCKETS:
+                self._tree[position] += 1
+                position += position & -position
+            self._total += 1
+
+    def _count_through(self, bucket: int) -> int:
+        count = 0
+        position = bucket + 1
+        while position > 0:
+            count += self._tree[position]
+            position -= position & -position
+        return count
+
+    def percentile(self, score: float, counted: bool = True) -> Optional[float]:
+        # Share of other completed exams scoring strictly lower; `counted` says whether this exam is already in.
+        bucket = _bucket(score)
+        with self._lock:
+            if not self._loaded:
+                return None
+            below = self._count_through(bucket - 1) if bucket else 0
+            others = self._total - 1 if counted else self._total
+        return round(below / others * 100, 2) if others > 0 else None
+
+    def load(self, counts: Iterable[Tuple[float, int]]):
+        tree = [0] * (SCORE_BUCKETS + 1)
+        total = 0
+        for score, count in counts:
+            tree[_bucket(score) + 1] += count
+            total += count
+        for position in range(1, SCORE_BUCKETS + 1):
+            parent = position + (position & -position)
+            if parent <= SCORE_BUCKETS:
+                tree[parent] += tree[position]
+        with self._lock:
+            self._tree = tree
+            self._total = total
+            self._loaded = True
+
+    def rebuild(self):
+        db = SessionLocal()
+        try:
+            counts = score_counts(db)
+        finally:
+            db.close()
+        # Submits committed while the query ran may be missed until the next rebuild.
+        self.load(counts)
+        score_distribution_rebuilds.inc()
+
+    def _run(self):
+        wait = 0
+        while not self._stopping.wait(wait):
+            try:
+                self.rebuild()
+            except Exception:
+                score_distribution_errors.inc()
+                wait = RETRY_SECONDS
+                continue
+            if self.refresh_seconds <= 0:
+                return
+            wait = self.refresh_seconds
+
+score_distribution = ScoreDistribution(settings.score_distribution_refresh_seconds)
+
+registry.register(Gauge(
+    "exam_app_score_distribution_exams", "Completed exams counted in the in-memory score distribution",
+    lambda: len(score_distribution)))
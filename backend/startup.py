@@ -0,0 +1,43 @@
+import time
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from config import settings
+from database import engine, async_engine, SessionLocal
+from hashing import get_pwd_context
+from metrics import registry, Gauge
+from question_sampler import question_sampler
+
+warmup_seconds = None
+
+registry.register(Gauge(
+    "exam_app_startup_warmup_seconds", "Time the background startup warm-up took (-1 while running)",
+    lambda: -1 if warmup_seconds is None else warmup_seconds))
+
+def _warm_up_sync():
+    # Open the pool's steady-state connections now rather than on the first requests.
+    connections = [engine.connect() for _ in range(max(1, settings.db_pool_size))]
+    try:
+        for connection in connections:
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+    db = SessionLocal()
+    try:
+        question_sampler.load(db)
+    finally:
+        db.close()
+
+    get_pwd_context()
+    import jose.jwt
+
+async def warm_up():
+    global warmup_seconds
+
+    started = time.perf_counter()
+    await run_in_threadpool(_warm_up_sync)
+    if async_engine is not None:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    warmup_seconds = time.perf_counter() - started
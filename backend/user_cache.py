@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import User
+from schemas import User as UserSchema
+from config import settings
+from cache_generations import USERS, mark_changed, on_generation_changed
+
+class TokenCache:
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, dict, UserSchema]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[Tuple[dict, UserSchema]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, claims, user = entry
+            if expires_at <= time.time():
+                self._discard(token)
+                return None
+            self._entries.move_to_end(token)
+            return claims, user
+
+    def put(self, token: str, claims: dict, user: UserSchema):
+        expires_at = time.time() + self.ttl_seconds
+        if claims.get("exp") is not None:
+            expires_at = min(expires_at, float(claims["exp"]))
+        with self._lock:
+            self._discard(token)
+            self._entries[token] = (expires_at, claims, user)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._discard(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _discard(self, token):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[2].id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+token_cache = TokenCache(settings.token_cache_size, settings.token_cache_ttl_seconds)
+
+on_generation_changed(USERS)(token_cache.clear)
+
+# Only columns copied into the cached snapshot; a password rehash on login must not flush every worker's cache.
+SNAPSHOT_COLUMNS = tuple(UserSchema.model_fields)
+
+def _snapshot_changed(user: User) -> bool:
+    attrs = inspect(user).attrs
+    return any(attrs[name].history.has_changes() for name in SNAPSHOT_COLUMNS)
+
+@event.listens_for(Session, "after_flush")
+def _track_user_changes(session, flush_context):
+    changed = session.info.setdefault("user_changes", set())
+    for obj in session.dirty:
+        if isinstance(obj, User) and _snapshot_changed(obj):
+            changed.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+    if changed:
+        mark_changed(session, USERS)
+
+@event.listens_for(Session, "after_commit")
+def _publish_user_changes(session):
+    for user_id in session.info.pop("user_changes", ()):
+        token_cache.invalidate_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(session):
+    session.info.pop("user_changes", None)
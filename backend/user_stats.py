@@ -0,0 +1,101 @@
+from datetime import datetime
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+from database import dialect_insert
+from models import Exam, UserStats
+from schemas import UserStats as UserStatsSchema
+
+def record_exam(db: Session, user_id: int, exam_id: int, score: float,
+                correct_answers: int, total_questions: int, completed_at: datetime):
+    values = {
+        "user_id": user_id,
+        "attempts": 1,
+        "best_score": score,
+        "score_sum": score,
+        "last_score": score,
+        "correct_answers_sum": correct_answers,
+        "total_questions_sum": total_questions,
+        "last_exam_id": exam_id,
+        "last_completed_at": completed_at,
+    }
+    statement = dialect_insert(db.get_bind().dialect.name, UserStats)
+    if statement is None:
+        stats = db.get(UserStats, user_id, with_for_update=True)
+        if stats is None:
+            db.add(UserStats(**values))
+            return
+        stats.attempts += 1
+        stats.best_score = max(stats.best_score or 0, score)
+        stats.score_sum += score
+        stats.last_score = score
+        stats.correct_answers_sum += correct_answers
+        stats.total_questions_sum += total_questions
+        stats.last_exam_id = exam_id
+        stats.last_completed_at = completed_at
+        return
+
+    excluded = statement.excluded
+    db.execute(statement.values(**values).on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            "attempts": UserStats.attempts + 1,
+            "best_score": case(
+                (UserStats.best_score >= excluded.best_score, UserStats.best_score),
+                else_=excluded.best_score
+            ),
+            "score_sum": UserStats.score_sum + excluded.score_sum,
+            "last_score": excluded.last_score,
+            "correct_answers_sum": UserStats.correct_answers_sum + excluded.correct_answers_sum,
+            "total_questions_sum": UserStats.total_questions_sum + excluded.total_questions_sum,
+            "last_exam_id": excluded.last_exam_id,
+            "last_completed_at": excluded.last_completed_at,
+        }
+    ))
+
+def get_user_stats(db: Session, user_id: int) -> UserStatsSchema:
+    stats = db.get(UserStats, user_id)
+    if stats is None:
+        return UserStatsSchema()
+    return UserStatsSchema(
+        attempts=stats.attempts,
+        best_score=stats.best_score,
+        mean_score=round(stats.score_sum / stats.attempts, 2) if stats.attempts else None,
+        last_score=stats.last_score,
+        correct_answers=stats.correct_answers_sum,
+        total_questions=stats.total_questions_sum,
+        last_exam_id=stats.last_exam_id,
+        last_completed_at=stats.last_completed_at
+    )
+
+def backfill_user_stats(db: Session) -> int:
+    completed = Exam.is_completed == True
+    totals = select(
+        Exam.user_id,
+        func.count(Exam.id).label("attempts"),
+        func.max(Exam.score).label("best_score"),
+        func.coalesce(func.sum(Exam.score), 0).label("score_sum"),
+        func.coalesce(func.sum(Exam.correct_answers), 0).label("correct_answers_sum"),
+        func.coalesce(func.sum(Exam.total_questions), 0).label("total_questions_sum"),
+    ).where(completed).group_by(Exam.user_id).subquery()
+    latest = select(
+        Exam.user_id,
+        Exam.id,
+        Exam.score,
+        Exam.end_time,
+        func.row_number().over(
+            partition_by=Exam.user_id,
+            order_by=(Exam.end_time.desc(), Exam.id.desc())
+        ).label("position"),
+    ).where(completed).subquery()
+
+    rows = select(
+        totals.c.user_id, totals.c.attempts, totals.c.best_score, totals.c.score_sum, latest.c.score,
+        totals.c.correct_answers_sum, totals.c.total_questions_sum, latest.c.id, latest.c.end_time,
+    ).join(latest, (latest.c.user_id == totals.c.user_id) & (latest.c.position == 1))
+
+    db.execute(delete(UserStats))
+    result = db.execute(insert(UserStats).from_select([
+        "user_id", "attempts", "best_score", "score_sum", "last_score",
+        "correct_answers_sum", "total_questions_sum", "last_exam_id", "last_completed_at",
+    ], rows))
+    return result.rowcount
@@ -59,6 +59,11 @@ const Results: React.FC = () => {
               <div className="text-sm text-gray-500">
                 Score: {result.correct_answers} out of {result.total_questions} correct
               </div>
+              {result.percentile !== null && (
+                <div className="text-sm text-gray-500 mt-1">
+                  You scored better than {result.percentile}% of completed exams
+                </div>
+              )}
             </div>
 
             {/* Detailed Results */}
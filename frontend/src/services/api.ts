@@ -70,8 +70,8 @@ export const examAPI = {
     return response.data;
   },
 
-  getHistory: async () => {
-    const response = await api.get('/exams/history');
+  getHistory: async (cursor?: string) => {
+    const response = await api.get('/exams/history', { params: { cursor } });
     return response.data;
   },
 };
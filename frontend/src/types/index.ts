@@ -30,6 +30,7 @@ export interface ExamResult {
   total_questions: number;
   correct_answers: number;
   percentage: number;
+  percentile: number | null;
   start_time: string;
   end_time: string;
 }